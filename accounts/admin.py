@@ -1,5 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
+from django.db.models import F
 from django.utils.html import format_html
 from .models import User, CreditTransaction, SubscriptionPlan, ActivityLog, PlatformSettings, Notification, SupportedLanguage, APIKey
 
@@ -164,23 +166,33 @@ class UserAdmin(BaseUserAdmin):
         updated = queryset.update(is_active=False)
         self.message_user(request, f'{updated} user(s) deactivated.', 'warning')
 
+    def _add_credits(self, request, queryset, amount):
+        """Credit every selected user with one UPDATE and one multi-row audit INSERT"""
+        with transaction.atomic():
+            updated = queryset.update(credits=F('credits') + amount)
+            CreditTransaction.objects.bulk_create([
+                CreditTransaction(
+                    user_id=user_id,
+                    amount=amount,
+                    transaction_type='bonus',
+                    description=f'Credits added by admin {request.user.email}',
+                    balance_after=credits
+                )
+                for user_id, credits in queryset.values_list('id', 'credits')
+            ], batch_size=500)
+        self.message_user(request, f'Added {amount} credits to {updated} user(s).', 'success')
+
     @admin.action(description='💰 Add 100 credits')
     def add_credits_100(self, request, queryset):
-        for user in queryset:
-            user.add_credits(100)
-        self.message_user(request, f'Added 100 credits to {queryset.count()} user(s).', 'success')
+        self._add_credits(request, queryset, 100)
 
     @admin.action(description='💎 Add 500 credits')
     def add_credits_500(self, request, queryset):
-        for user in queryset:
-            user.add_credits(500)
-        self.message_user(request, f'Added 500 credits to {queryset.count()} user(s).', 'success')
+        self._add_credits(request, queryset, 500)
 
     @admin.action(description='🎁 Add 1000 credits')
     def add_credits_1000(self, request, queryset):
-        for user in queryset:
-            user.add_credits(1000)
-        self.message_user(request, f'Added 1000 credits to {queryset.count()} user(s).', 'success')
+        self._add_credits(request, queryset, 1000)
 
     @admin.action(description='➖ Remove 100 credits')
     def remove_credits_100(self, request, queryset):
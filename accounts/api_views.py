@@ -8,6 +8,9 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from .models import APIKey, User
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @login_required
@@ -285,8 +288,6 @@ def api_generate_voice(request):
             'error': 'Invalid JSON data'
         }, status=400)
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"API voice generation error: {str(e)}", exc_info=True)
         return JsonResponse({
             'success': False,
@@ -353,8 +354,6 @@ def api_list_voices(request):
         })
 
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"API list voices error: {str(e)}", exc_info=True)
         return JsonResponse({
             'success': False,
@@ -490,8 +489,6 @@ def api_clone_voice(request):
         })
 
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"API clone voice error: {str(e)}", exc_info=True)
         return JsonResponse({
             'success': False,
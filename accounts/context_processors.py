@@ -9,7 +9,7 @@ def platform_settings(request):
     """
     Make platform settings available in all templates
     """
-    settings = PlatformSettings.get_settings()
+    settings = getattr(request, 'platform_settings', None) or PlatformSettings.get_settings()
 
     return {
         'google_oauth_enabled': settings.google_login_enabled and settings.google_client_id and settings.google_client_secret,
@@ -1,8 +1,11 @@
 """
 Middleware to track user activity for online/offline status
+and to share platform settings across a request
 """
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.contrib.auth import get_user_model
+from .models import PlatformSettings
 
 User = get_user_model()
 
@@ -24,3 +27,17 @@ class UserActivityMiddleware:
 
         response = self.get_response(request)
         return response
+
+
+class PlatformSettingsMiddleware:
+    """
+    Attach platform settings to the request as request.platform_settings
+    Loaded on first access, then reused by views and context processors
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.platform_settings = SimpleLazyObject(PlatformSettings.get_settings)
+        return self.get_response(request)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_alter_user_subscription_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='credittransaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=128, null=True, unique=True),
+        ),
+    ]
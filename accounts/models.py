@@ -1,8 +1,16 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 from .language_models import SupportedLanguage
 
+# PlatformSettings is read on every gateway/credit lookup; keep it out of the DB for a minute.
+# No CACHES is configured, so this is a per-process LocMemCache: the post_save invalidation
+# only reaches the process that saved, others may serve the old row for up to the timeout.
+PLATFORM_SETTINGS_CACHE_KEY = 'platform_settings'
+PLATFORM_SETTINGS_CACHE_TIMEOUT = 60
+
 
 class User(AbstractUser):
     """Custom User model with credit system"""
@@ -66,9 +74,9 @@ class User(AbstractUser):
         return False
 
     def add_credits(self, amount):
-        """Add credits to user account"""
-        self.credits += amount
-        self.save()
+        """Add credits to user account (atomic in the database, safe under concurrency)"""
+        type(self).objects.filter(pk=self.pk).update(credits=F('credits') + amount)
+        self.refresh_from_db(fields=['credits'])
 
     def can_use_api(self):
         """Check if user has API access (Pro/Yearly plans only)"""
@@ -101,6 +109,8 @@ class CreditTransaction(models.Model):
     )
     description = models.TextField()
     balance_after = models.IntegerField()
+    # e.g. "paypal:<order id>"; a second award for the same payment fails on insert
+    idempotency_key = models.CharField(max_length=128, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -407,8 +417,18 @@ class PlatformSettings(models.Model):
 
     @classmethod
     def get_settings(cls):
-        """Get or create platform settings (singleton pattern)"""
-        settings, created = cls.objects.get_or_create(pk=1)
+        """
+        Get or create platform settings (singleton pattern, cached)
+
+        The cache is per process unless a shared CACHES backend is configured,
+        so after an admin save other workers can return the previous settings
+        for up to PLATFORM_SETTINGS_CACHE_TIMEOUT seconds. Read the row directly
+        where that window is unacceptable (see payments.get_payment_gateway).
+        """
+        settings = cache.get(PLATFORM_SETTINGS_CACHE_KEY)
+        if settings is None:
+            settings, created = cls.objects.get_or_create(pk=1)
+            cache.set(PLATFORM_SETTINGS_CACHE_KEY, settings, PLATFORM_SETTINGS_CACHE_TIMEOUT)
         return settings
 
     def save(self, *args, **kwargs):
@@ -420,25 +440,29 @@ class PlatformSettings(models.Model):
         """Prevent deletion"""
         pass
 
-    @classmethod
-    def get_enabled_gateways(cls):
-        """Get list of enabled payment gateways"""
-        settings = cls.get_settings()
+    @property
+    def enabled_gateways(self):
+        """List of enabled payment gateways for these settings"""
         enabled = []
 
-        if settings.stripe_enabled and settings.stripe_secret_key:
+        if self.stripe_enabled and self.stripe_secret_key:
             enabled.append('stripe')
-        if settings.paypal_enabled and settings.paypal_client_id:
+        if self.paypal_enabled and self.paypal_client_id:
             enabled.append('paypal')
         # JazzCash: Check for either API credentials OR manual payment account details
-        if settings.jazzcash_enabled and (settings.jazzcash_merchant_id or settings.jazzcash_account_number):
+        if self.jazzcash_enabled and (self.jazzcash_merchant_id or self.jazzcash_account_number):
             enabled.append('jazzcash')
         # Easypaisa: Check for either API credentials OR manual payment account details
-        if settings.easypaisa_enabled and (settings.easypaisa_store_id or settings.easypaisa_account_number):
+        if self.easypaisa_enabled and (self.easypaisa_store_id or self.easypaisa_account_number):
             enabled.append('easypaisa')
 
         return enabled
 
+    @classmethod
+    def get_enabled_gateways(cls):
+        """Get list of enabled payment gateways"""
+        return cls.get_settings().enabled_gateways
+
 
 class Notification(models.Model):
     """User notifications for various events"""
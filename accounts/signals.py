@@ -2,6 +2,8 @@
 Signal handlers for user authentication events
 """
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -47,3 +49,16 @@ def user_logged_out_handler(sender, request, user, **kwargs):
             metadata={'logout_time': timezone.now().isoformat()},
             request=request
         )
+
+
+@receiver(post_save, sender='accounts.PlatformSettings')
+def platform_settings_saved_handler(sender, instance, **kwargs):
+    """
+    Drop the cached platform settings so the next get_settings() reloads them
+
+    Only clears this process's cache with the default LocMemCache; other
+    processes pick the change up when their entry expires.
+    """
+    from .models import PLATFORM_SETTINGS_CACHE_KEY
+
+    cache.delete(PLATFORM_SETTINGS_CACHE_KEY)
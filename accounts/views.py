@@ -2383,8 +2383,6 @@ def execute_sql_query(request):
 def update_table_record(request, table_name):
     """Update a record in a table"""
     from django.db import connection
-    import logging
-    logger = logging.getLogger(__name__)
 
     try:
         record_id = request.data.get('id')
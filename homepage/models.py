@@ -78,6 +78,7 @@ class Statistic(models.Model):
     label = models.CharField(_('Label'), max_length=100)
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Statistic')
@@ -95,6 +96,7 @@ class Feature(models.Model):
     description = models.TextField(_('Description'))
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Feature')
@@ -113,6 +115,7 @@ class HowItWorksStep(models.Model):
     description = models.TextField(_('Description'))
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('How It Works Step')
@@ -130,6 +133,7 @@ class DemoVoice(models.Model):
     audio_file = models.FileField(_('Audio File'), upload_to='demo_voices/', blank=True, null=True)
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Demo Voice')
@@ -148,6 +152,7 @@ class Testimonial(models.Model):
     author_initials = models.CharField(_('Author Initials'), max_length=3, help_text='e.g., JD')
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Testimonial')
@@ -166,6 +171,7 @@ class UseCase(models.Model):
     slide_number = models.IntegerField(_('Slide Number'), default=1, help_text='Which carousel slide (1 or 2)')
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Use Case')
@@ -184,6 +190,7 @@ class VideoSection(models.Model):
     video_thumbnail = models.ImageField(_('Video Thumbnail'), upload_to='video_thumbnails/', blank=True, null=True)
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Video Section')
@@ -233,6 +240,7 @@ class PricingPlan(models.Model):
     badge_text = models.CharField(_('Badge Text'), max_length=50, blank=True, help_text='e.g., Most Popular')
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Pricing Plan')
@@ -264,6 +272,7 @@ class FAQ(models.Model):
     answer = models.TextField(_('Answer'))
     order = models.IntegerField(_('Order'), default=0)
     is_active = models.BooleanField(_('Active'), default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('FAQ')
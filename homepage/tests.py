@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+
+from .models import DemoVoice
+
+User = get_user_model()
+
+SAVE_URL = '/api/lp-demo-voices/save/'
+
+
+def _stored_files(root):
+    return [os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names]
+
+
+class DemoVoiceUploadAccessTests(TestCase):
+    """The demo voice upload must not reach storage for rejected requests"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass', is_staff=True
+        )
+        self.member = User.objects.create_user(
+            username='member', email='member@example.com', password='pass'
+        )
+
+    def _post(self, client, **extra):
+        audio = SimpleUploadedFile('voice.mp3', b'ID3' + b'\x00' * 2048, content_type='audio/mpeg')
+        data = {'name': 'Sarah', 'description': 'Demo', 'audio_file': audio}
+        data.update(extra)
+        return client.post(SAVE_URL, data)
+
+    def test_anonymous_post_stores_nothing(self):
+        response = self._post(self.client)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(_stored_files(self.media_root), [])
+        self.assertFalse(DemoVoice.objects.exists())
+
+    def test_non_staff_post_stores_nothing(self):
+        self.client.force_login(self.member)
+
+        response = self._post(self.client)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(_stored_files(self.media_root), [])
+        self.assertFalse(DemoVoice.objects.exists())
+
+    def test_staff_post_without_csrf_token_stores_nothing(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.staff)
+
+        response = self._post(client)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(_stored_files(self.media_root), [])
+        self.assertFalse(DemoVoice.objects.exists())
+
+    def test_staff_get_is_rejected(self):
+        self.client.force_login(self.staff)
+
+        response = self.client.get(SAVE_URL)
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_staff_post_stores_upload(self):
+        self.client.force_login(self.staff)
+
+        response = self._post(self.client)
+
+        self.assertTrue(response.json()['success'])
+        voice = DemoVoice.objects.get()
+        self.assertTrue(voice.audio_file.name.startswith('demo_voices/'))
+        self.assertEqual(_stored_files(self.media_root), [os.path.join(self.media_root, voice.audio_file.name)])
+
+    def test_failed_save_removes_stored_upload(self):
+        self.client.force_login(self.staff)
+
+        response = self._post(self.client, item_id='999')
+
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(_stored_files(self.media_root), [])
+
+    def test_replacing_audio_removes_previous_file(self):
+        self.client.force_login(self.staff)
+        self._post(self.client)
+        voice = DemoVoice.objects.get()
+        previous = voice.audio_file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(self.client, item_id=str(voice.id))
+
+        self.assertTrue(response.json()['success'])
+        voice.refresh_from_db()
+        self.assertNotEqual(voice.audio_file.name, previous)
+        self.assertEqual(_stored_files(self.media_root), [os.path.join(self.media_root, voice.audio_file.name)])
@@ -0,0 +1,88 @@
+"""
+Upload handlers for landing page media
+Write uploaded files straight into their final storage location
+"""
+import os
+import logging
+from django.core.files.uploadhandler import FileUploadHandler
+
+logger = logging.getLogger(__name__)
+
+
+class StoredUpload:
+    """Result of a direct-to-storage upload (already saved, just assign `name`)"""
+
+    def __init__(self, name, size, content_type=None):
+        self.name = name
+        self.size = size
+        self.content_type = content_type
+
+
+class DirectStorageUploadHandler(FileUploadHandler):
+    """
+    Stream upload chunks directly into the storage of a model FileField
+
+    Args:
+        model: Django model class owning the file field
+        field_name: Name of the FileField (and of the form field)
+
+    The completed upload is exposed in request.FILES as a StoredUpload whose
+    `name` can be assigned to the model field without copying the file again.
+    """
+
+    def __init__(self, model, field_name, request=None):
+        super().__init__(request)
+        self.model_field = model._meta.get_field(field_name)
+        self.target_field = field_name
+        self.destination = None
+        self.stored_name = None
+        self.size = 0
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name != self.target_field:
+            self.destination = None
+            return
+
+        storage = self.model_field.storage
+        name = self.model_field.generate_filename(None, self.file_name)
+        self.stored_name = storage.get_available_name(name, max_length=self.model_field.max_length)
+        try:
+            os.makedirs(os.path.dirname(storage.path(self.stored_name)), exist_ok=True)
+        except NotImplementedError:
+            # Remote storages (S3, GCS) have no local directories to create
+            pass
+        self.destination = storage.open(self.stored_name, 'wb')
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.destination is None:
+            return raw_data
+        self.destination.write(raw_data)
+        self.size += len(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.destination is None:
+            return None
+        self.destination.close()
+        self.destination = None
+        logger.info(f"Stored upload directly: {self.stored_name} ({self.size} bytes)")
+        return StoredUpload(self.stored_name, self.size, self.content_type)
+
+    def upload_interrupted(self):
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+            self.model_field.storage.delete(self.stored_name)
+
+    def discard(self):
+        """Delete the stored file, e.g. when the request it came with is rejected"""
+        if self.stored_name is None:
+            return
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+        self.model_field.storage.delete(self.stored_name)
+        logger.info(f"Discarded direct upload: {self.stored_name}")
+        self.stored_name = None
@@ -1,9 +1,16 @@
+import json
+from operator import attrgetter
 from django.shortcuts import render, get_object_or_404
+from django.views import View
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.views import redirect_to_login
 from django.utils.decorators import method_decorator
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse, HttpResponseNotAllowed
+from django.db import transaction
+from django.core.files.storage import default_storage
+from django.views.decorators.http import require_POST, condition
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from .models import (
     CarouselSlide, HeroSection, Statistic, Feature, HowItWorksStep,
     DemoVoice, Testimonial, UseCase, VideoSection,
@@ -11,6 +18,7 @@ from .models import (
     LiveStatistic, APIFeature, APISection, LanguageSupport,
     CTASection, HeroFeature, PricingFeature, VideoFeature, CTAFeature
 )
+from .upload_handlers import DirectStorageUploadHandler
 
 
 class HomePageView(TemplateView):
@@ -393,628 +401,420 @@ class CarouselCRUDView(TemplateView):
 # AJAX API ENDPOINTS FOR CRUD OPERATIONS
 # ============================================
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_hero_section(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            hero = get_object_or_404(HeroSection, id=item_id)
-        else:
-            hero = HeroSection()
-
-        hero.badge_text = request.POST.get('badge_text', '')
-        hero.title = request.POST.get('title', '')
-        hero.subtitle = request.POST.get('subtitle', '')
-        hero.primary_button_text = request.POST.get('primary_button_text', '')
-        hero.primary_button_url = request.POST.get('primary_button_url', '')
-        hero.secondary_button_text = request.POST.get('secondary_button_text', '')
-        hero.secondary_button_url = request.POST.get('secondary_button_url', '')
-        hero.order = int(request.POST.get('order', 0))
-        hero.is_active = request.POST.get('is_active') == 'on'
-        hero.save()
-
-        return JsonResponse({'success': True, 'message': 'Hero section saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_hero_section(request, item_id):
-    try:
-        hero = get_object_or_404(HeroSection, id=item_id)
-        data = {
-            'id': hero.id,
-            'badge_text': hero.badge_text,
-            'title': hero.title,
-            'subtitle': hero.subtitle,
-            'primary_button_text': hero.primary_button_text,
-            'primary_button_url': hero.primary_button_url,
-            'secondary_button_text': hero.secondary_button_text,
-            'secondary_button_url': hero.secondary_button_url,
-            'order': hero.order,
-            'is_active': hero.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_hero_section(request, item_id):
-    try:
-        hero = get_object_or_404(HeroSection, id=item_id)
-        hero.delete()
-        return JsonResponse({'success': True, 'message': 'Hero section deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_statistic(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            stat = get_object_or_404(Statistic, id=item_id)
-        else:
-            stat = Statistic()
-
-        stat.icon = request.POST.get('icon', '')
-        stat.number = request.POST.get('number', '')
-        stat.label = request.POST.get('label', '')
-        stat.order = int(request.POST.get('order', 0))
-        stat.is_active = request.POST.get('is_active') == 'on'
-        stat.save()
-
-        return JsonResponse({'success': True, 'message': 'Statistic saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_statistic(request, item_id):
-    try:
-        stat = get_object_or_404(Statistic, id=item_id)
-        data = {
-            'id': stat.id,
-            'icon': stat.icon,
-            'number': stat.number,
-            'label': stat.label,
-            'order': stat.order,
-            'is_active': stat.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_statistic(request, item_id):
-    try:
-        stat = get_object_or_404(Statistic, id=item_id)
-        stat.delete()
-        return JsonResponse({'success': True, 'message': 'Statistic deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_feature(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            feature = get_object_or_404(Feature, id=item_id)
-        else:
-            feature = Feature()
-
-        feature.icon = request.POST.get('icon', '')
-        feature.title = request.POST.get('title', '')
-        feature.description = request.POST.get('description', '')
-        feature.order = int(request.POST.get('order', 0))
-        feature.is_active = request.POST.get('is_active') == 'on'
-        feature.save()
-
-        return JsonResponse({'success': True, 'message': 'Feature saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_feature(request, item_id):
-    try:
-        feature = get_object_or_404(Feature, id=item_id)
-        data = {
-            'id': feature.id,
-            'icon': feature.icon,
-            'title': feature.title,
-            'description': feature.description,
-            'order': feature.order,
-            'is_active': feature.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+# Pre-parsed small integers for order / slide_number form values
+_INT_CACHE = {str(i): i for i in range(-1, 1000)}
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_feature(request, item_id):
-    try:
-        feature = get_object_or_404(Feature, id=item_id)
-        feature.delete()
-        return JsonResponse({'success': True, 'message': 'Feature deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+def _int_field(post, key, default):
+    """Parse an integer form field, skipping int() for common small values"""
+    value = post.get(key) or str(default)
+    cached = _INT_CACHE.get(value)
+    return cached if cached is not None else int(value)
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_step(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            step = get_object_or_404(HowItWorksStep, id=item_id)
-        else:
-            step = HowItWorksStep()
-
-        step.icon = request.POST.get('icon', '')
-        step.title = request.POST.get('title', '')
-        step.description = request.POST.get('description', '')
-        step.order = int(request.POST.get('order', 0))
-        step.is_active = request.POST.get('is_active') == 'on'
-        step.save()
-
-        return JsonResponse({'success': True, 'message': 'Step saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_step(request, item_id):
-    try:
-        step = get_object_or_404(HowItWorksStep, id=item_id)
-        data = {
-            'id': step.id,
-            'icon': step.icon,
-            'title': step.title,
-            'description': step.description,
-            'order': step.order,
-            'is_active': step.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+def _cbx(post, key):
+    """Checkbox form value; unchecked boxes are simply absent from POST"""
+    value = post.get(key)
+    return value == 'on' if value else False
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_step(request, item_id):
-    try:
-        step = get_object_or_404(HowItWorksStep, id=item_id)
-        step.delete()
-        return JsonResponse({'success': True, 'message': 'Step deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+def _schema(*fields):
+    """Precompile a (fields, getter) pair for _serialize"""
+    return fields, attrgetter(*fields)
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_testimonial(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            testimonial = get_object_or_404(Testimonial, id=item_id)
-        else:
-            testimonial = Testimonial()
-
-        testimonial.quote = request.POST.get('quote', '')
-        testimonial.author_name = request.POST.get('author_name', '')
-        testimonial.author_title = request.POST.get('author_title', '')
-        testimonial.author_initials = request.POST.get('author_initials', '')
-        testimonial.order = int(request.POST.get('order', 0))
-        testimonial.is_active = request.POST.get('is_active') == 'on'
-        testimonial.save()
-
-        return JsonResponse({'success': True, 'message': 'Testimonial saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_testimonial(request, item_id):
-    try:
-        testimonial = get_object_or_404(Testimonial, id=item_id)
-        data = {
-            'id': testimonial.id,
-            'quote': testimonial.quote,
-            'author_name': testimonial.author_name,
-            'author_title': testimonial.author_title,
-            'author_initials': testimonial.author_initials,
-            'order': testimonial.order,
-            'is_active': testimonial.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_testimonial(request, item_id):
-    try:
-        testimonial = get_object_or_404(Testimonial, id=item_id)
-        testimonial.delete()
-        return JsonResponse({'success': True, 'message': 'Testimonial deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_pricing_plan(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            plan = get_object_or_404(PricingPlan, id=item_id)
-        else:
-            plan = PricingPlan()
-
-        plan.name = request.POST.get('name', '')
-        plan.price = request.POST.get('price', '')
-        plan.period = request.POST.get('period', '')
-        plan.description = request.POST.get('description', '')
-        plan.button_text = request.POST.get('button_text', '')
-        plan.button_url = request.POST.get('button_url', '')
-        plan.is_popular = request.POST.get('is_popular') == 'on'
-        plan.order = int(request.POST.get('order', 0))
-        plan.is_active = request.POST.get('is_active') == 'on'
-        plan.save()
-
-        return JsonResponse({'success': True, 'message': 'Pricing plan saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_pricing_plan(request, item_id):
-    try:
-        plan = get_object_or_404(PricingPlan, id=item_id)
-        data = {
-            'id': plan.id,
-            'name': plan.name,
-            'price': plan.price,
-            'period': plan.period,
-            'description': plan.description,
-            'button_text': plan.button_text,
-            'button_url': plan.button_url,
-            'is_popular': plan.is_popular,
-            'order': plan.order,
-            'is_active': plan.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+def _serialize(obj, schema):
+    """Build a dict from a model instance in a single attrgetter call"""
+    fields, getter = schema
+    return dict(zip(fields, getter(obj)))
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_pricing_plan(request, item_id):
-    try:
-        plan = get_object_or_404(PricingPlan, id=item_id)
-        plan.delete()
-        return JsonResponse({'success': True, 'message': 'Pricing plan deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+# Fields returned by the get_* endpoints
+HERO_SCHEMA = _schema(
+    'id', 'badge_text', 'title', 'subtitle', 'primary_button_text', 'primary_button_url',
+    'secondary_button_text', 'secondary_button_url', 'order', 'is_active',
+)
+STATISTIC_SCHEMA = _schema(
+    'id', 'icon', 'number', 'label', 'order', 'is_active',
+)
+FEATURE_SCHEMA = _schema(
+    'id', 'icon', 'title', 'description', 'order', 'is_active',
+)
+STEP_SCHEMA = _schema(
+    'id', 'icon', 'title', 'description', 'order', 'is_active',
+)
+TESTIMONIAL_SCHEMA = _schema(
+    'id', 'quote', 'author_name', 'author_title', 'author_initials', 'order', 'is_active',
+)
+PRICING_PLAN_SCHEMA = _schema(
+    'id', 'name', 'price', 'period', 'description', 'button_text', 'button_url',
+    'is_popular', 'order', 'is_active',
+)
+FAQ_SCHEMA = _schema(
+    'id', 'question', 'answer', 'order', 'is_active',
+)
+DEMO_VOICE_SCHEMA = _schema(
+    'id', 'name', 'description', 'order', 'is_active',
+)
+USECASE_SCHEMA = _schema(
+    'id', 'icon', 'title', 'description', 'slide_number', 'order', 'is_active',
+)
+VIDEO_SECTION_SCHEMA = _schema(
+    'id', 'title', 'subtitle', 'order', 'is_active',
+)
+CAROUSEL_SLIDE_SCHEMA = _schema(
+    'id', 'title', 'subtitle', 'description', 'button_text', 'button_url',
+    'background_color', 'text_color', 'order', 'is_active',
+)
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_faq(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            faq = get_object_or_404(FAQ, id=item_id)
-        else:
-            faq = FAQ()
-
-        faq.question = request.POST.get('question', '')
-        faq.answer = request.POST.get('answer', '')
-        faq.order = int(request.POST.get('order', 0))
-        faq.is_active = request.POST.get('is_active') == 'on'
-        faq.save()
-
-        return JsonResponse({'success': True, 'message': 'FAQ saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+# Section key -> (model, ordering) for the combined dashboard listing
+DASHBOARD_SECTIONS = (
+    ('carousel', CarouselSlide, ('order',)),
+    ('hero', HeroSection, ('order',)),
+    ('statistics', Statistic, ('order',)),
+    ('features', Feature, ('order',)),
+    ('steps', HowItWorksStep, ('order',)),
+    ('testimonials', Testimonial, ('order',)),
+    ('demo_voices', DemoVoice, ('order',)),
+    ('pricing', PricingPlan, ('order',)),
+    ('faqs', FAQ, ('order',)),
+    ('usecases', UseCase, ('slide_number', 'order')),
+    ('video', VideoSection, ('order',)),
+)
 
 
 @login_required
 @user_passes_test(is_staff)
-def get_faq(request, item_id):
+def dashboard_state(request):
+    """Return every landing page section list in a single response"""
     try:
-        faq = get_object_or_404(FAQ, id=item_id)
         data = {
-            'id': faq.id,
-            'question': faq.question,
-            'answer': faq.answer,
-            'order': faq.order,
-            'is_active': faq.is_active,
+            key: list(model.objects.order_by(*ordering).values())
+            for key, model, ordering in DASHBOARD_SECTIONS
         }
         return JsonResponse(data)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_faq(request, item_id):
-    try:
-        faq = get_object_or_404(FAQ, id=item_id)
-        faq.delete()
-        return JsonResponse({'success': True, 'message': 'FAQ deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_demo_voice(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            voice = get_object_or_404(DemoVoice, id=item_id)
-        else:
-            voice = DemoVoice()
-
-        voice.name = request.POST.get('name', '')
-        voice.description = request.POST.get('description', '')
-        voice.order = int(request.POST.get('order', 0))
-        voice.is_active = request.POST.get('is_active') == 'on'
-
-        # Handle audio file upload
+class StaffJsonView(View):
+    """
+    Base class for the landing page AJAX endpoints
+
+    Login, staff and HTTP method checks run once in check_access(). Each section
+    subclass only declares its model, label, response schema and form fields,
+    so one generic save/get/delete body serves every section; the URL conf
+    picks the operation with as_view(action='save'|'get'|'delete').
+    """
+    model = None
+    label = ''
+    schema = None
+    action = None
+    file_fields = ()
+    list_select_related = ()
+
+    # Form fields copied onto the model by populate()
+    string_fields = ()
+    string_defaults = {}
+    int_fields = {'order': 0}
+    bool_fields = ('is_active',)
+    upload_fields = ()
+
+    # Operation -> allowed HTTP method
+    ACTION_METHODS = {'save': 'POST', 'get': 'GET', 'delete': 'POST'}
+
+    def check_access(self, request):
+        """Response rejecting the request, or None if it may proceed"""
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not request.user.is_staff:
+            return JsonResponse({'error': 'forbidden'}, status=403)
+        if request.method != self.ACTION_METHODS[self.action]:
+            return HttpResponseNotAllowed([self.ACTION_METHODS[self.action]])
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        rejected = self.check_access(request)
+        if rejected is not None:
+            return rejected
+        return getattr(self, self.action)(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = self.model.objects.all()
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+    def get_object(self, item_id):
+        return get_object_or_404(self.get_queryset(), id=item_id)
+
+    def populate(self, item, request):
+        """Copy submitted form values onto `item`"""
+        post = request.POST
+        for name in self.string_fields:
+            setattr(item, name, post.get(name, self.string_defaults.get(name, '')))
+        for name, default in self.int_fields.items():
+            setattr(item, name, _int_field(post, name, default))
+        for name in self.bool_fields:
+            setattr(item, name, _cbx(post, name))
+        for name in self.upload_fields:
+            if name in request.FILES:
+                setattr(item, name, request.FILES[name])
+
+    def extra_data(self, item):
+        """Computed values added to the get response"""
+        return {}
+
+    def save(self, request):
+        try:
+            item_id = request.POST.get('item_id')
+            if item_id:
+                item = self.get_object(item_id)
+            else:
+                item = self.model()
+
+            self.populate(item, request)
+            item.save()
+        except Exception as e:
+            self.save_failed()
+            return JsonResponse({'success': False, 'error': str(e)})
+
+        self.saved(item)
+        return JsonResponse({'success': True, 'message': f'{self.label} saved successfully'})
+
+    def saved(self, item):
+        """Hook run once `item` has been written"""
+
+    def save_failed(self):
+        """Hook run when a save is rejected, e.g. to remove files already stored"""
+
+    def get_etag(self, request, item_id):
+        """Weak ETag from updated_at, read without loading the whole row"""
+        updated_at = self.model.objects.filter(id=item_id).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None
+        return f'W/"{item_id}-{updated_at.timestamp()}"'
+
+    def get(self, request, item_id):
+        # Unchanged rows are answered with 304 before any serialization
+        return condition(etag_func=self.get_etag)(self.get_response)(request, item_id)
+
+    def get_response(self, request, item_id):
+        try:
+            item = self.get_object(item_id)
+            data = _serialize(item, self.schema)
+            data.update(self.extra_data(item))
+            return JsonResponse(data)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    def delete(self, request, item_id):
+        try:
+            item = self.get_object(item_id)
+            # Remove stored media through the storage directly; FieldFile.delete()
+            # would issue an extra UPDATE on a row that is about to be deleted
+            for field_name in self.file_fields:
+                field_file = getattr(item, field_name)
+                if field_file:
+                    field_file.storage.delete(field_file.name)
+            item.delete()
+            return JsonResponse({'success': True, 'message': f'{self.label} deleted successfully'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+
+
+class HeroSectionAPIView(StaffJsonView):
+    model = HeroSection
+    label = 'Hero section'
+    schema = HERO_SCHEMA
+    string_fields = (
+        'badge_text', 'title', 'subtitle', 'primary_button_text', 'primary_button_url',
+        'secondary_button_text', 'secondary_button_url',
+    )
+
+
+class StatisticAPIView(StaffJsonView):
+    model = Statistic
+    label = 'Statistic'
+    schema = STATISTIC_SCHEMA
+    string_fields = ('icon', 'number', 'label')
+
+
+class FeatureAPIView(StaffJsonView):
+    model = Feature
+    label = 'Feature'
+    schema = FEATURE_SCHEMA
+    string_fields = ('icon', 'title', 'description')
+
+
+class StepAPIView(StaffJsonView):
+    model = HowItWorksStep
+    label = 'Step'
+    schema = STEP_SCHEMA
+    string_fields = ('icon', 'title', 'description')
+
+
+class TestimonialAPIView(StaffJsonView):
+    model = Testimonial
+    label = 'Testimonial'
+    schema = TESTIMONIAL_SCHEMA
+    string_fields = ('quote', 'author_name', 'author_title', 'author_initials')
+
+
+class PricingPlanAPIView(StaffJsonView):
+    model = PricingPlan
+    label = 'Pricing plan'
+    schema = PRICING_PLAN_SCHEMA
+    string_fields = ('name', 'price', 'period', 'description', 'button_text', 'button_url')
+    bool_fields = ('is_popular', 'is_active')
+
+
+class FAQAPIView(StaffJsonView):
+    model = FAQ
+    label = 'FAQ'
+    schema = FAQ_SCHEMA
+    string_fields = ('question', 'answer')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class DemoVoiceAPIView(StaffJsonView):
+    model = DemoVoice
+    label = 'Demo voice'
+    schema = DEMO_VOICE_SCHEMA
+    file_fields = ('audio_file',)
+    string_fields = ('name', 'description')
+    upload_handler = None
+    replaced_audio = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # Reject anonymous, non-staff and wrong-method requests before anything
+        # reads the body, so their uploads never reach storage
+        rejected = self.check_access(request)
+        if rejected is not None:
+            return rejected
+        if self.action != 'save':
+            return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+        # Upload handlers must be installed before request.POST is read, so
+        # CSRF is checked here instead of by the middleware
+        self.upload_handler = DirectStorageUploadHandler(DemoVoice, 'audio_file', request)
+        request.upload_handlers.insert(0, self.upload_handler)
+        response = csrf_protect(super().dispatch)(request, *args, **kwargs)
+        if response.status_code == 403:
+            # CSRF rejected after the body (and the upload) was already parsed
+            self.upload_handler.discard()
+        return response
+
+    def populate(self, voice, request):
+        super().populate(voice, request)
+
+        # Handle audio file upload (already written to storage by the upload handler)
         if 'audio_file' in request.FILES:
-            voice.audio_file = request.FILES['audio_file']
-
-        voice.save()
-
-        return JsonResponse({'success': True, 'message': 'Demo voice saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_demo_voice(request, item_id):
-    try:
-        voice = get_object_or_404(DemoVoice, id=item_id)
-        data = {
-            'id': voice.id,
-            'name': voice.name,
-            'description': voice.description,
-            'order': voice.order,
-            'is_active': voice.is_active,
-            'audio_file': voice.audio_file.url if voice.audio_file else '',
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_demo_voice(request, item_id):
-    try:
-        voice = get_object_or_404(DemoVoice, id=item_id)
-        # Delete audio file if exists
-        if voice.audio_file:
-            voice.audio_file.delete()
-        voice.delete()
-        return JsonResponse({'success': True, 'message': 'Demo voice deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_usecase(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            usecase = get_object_or_404(UseCase, id=item_id)
-        else:
-            usecase = UseCase()
-
-        usecase.icon = request.POST.get('icon', '')
-        usecase.title = request.POST.get('title', '')
-        usecase.description = request.POST.get('description', '')
-        usecase.slide_number = int(request.POST.get('slide_number', 1))
-        usecase.order = int(request.POST.get('order', 0))
-        usecase.is_active = request.POST.get('is_active') == 'on'
-        usecase.save()
-
-        return JsonResponse({'success': True, 'message': 'Use case saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_usecase(request, item_id):
-    try:
-        usecase = get_object_or_404(UseCase, id=item_id)
-        data = {
-            'id': usecase.id,
-            'icon': usecase.icon,
-            'title': usecase.title,
-            'description': usecase.description,
-            'slide_number': usecase.slide_number,
-            'order': usecase.order,
-            'is_active': usecase.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_usecase(request, item_id):
-    try:
-        usecase = get_object_or_404(UseCase, id=item_id)
-        usecase.delete()
-        return JsonResponse({'success': True, 'message': 'Use case deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_video_section(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            video = get_object_or_404(VideoSection, id=item_id)
-        else:
-            video = VideoSection()
-
-        video.title = request.POST.get('title', '')
-        video.subtitle = request.POST.get('subtitle', '')
-
-        if 'video_file' in request.FILES:
-            video.video_file = request.FILES['video_file']
-        if 'video_thumbnail' in request.FILES:
-            video.video_thumbnail = request.FILES['video_thumbnail']
-
-        video.order = int(request.POST.get('order', 0))
-        video.is_active = request.POST.get('is_active') == 'on'
-        video.save()
-
-        return JsonResponse({'success': True, 'message': 'Video section saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
-
-
-@login_required
-@user_passes_test(is_staff)
-def get_video_section(request, item_id):
-    try:
-        video = get_object_or_404(VideoSection, id=item_id)
-        data = {
-            'id': video.id,
-            'title': video.title,
-            'subtitle': video.subtitle,
+            self.replaced_audio = voice.audio_file.name or None
+            voice.audio_file = request.FILES['audio_file'].name
+
+    def saved(self, voice):
+        # The row now points at the new upload; drop the file it replaced
+        replaced_audio = self.replaced_audio
+        if replaced_audio and replaced_audio != voice.audio_file.name:
+            storage = voice.audio_file.storage
+            transaction.on_commit(lambda: storage.delete(replaced_audio), robust=True)
+
+    def save_failed(self):
+        # The upload was streamed to storage while the request was parsed
+        if self.upload_handler is not None:
+            self.upload_handler.discard()
+
+    def extra_data(self, voice):
+        return {'audio_file': voice.audio_file.url if voice.audio_file else ''}
+
+
+class UseCaseAPIView(StaffJsonView):
+    model = UseCase
+    label = 'Use case'
+    schema = USECASE_SCHEMA
+    string_fields = ('icon', 'title', 'description')
+    int_fields = {'slide_number': 1, 'order': 0}
+
+
+class VideoSectionAPIView(StaffJsonView):
+    model = VideoSection
+    label = 'Video section'
+    schema = VIDEO_SECTION_SCHEMA
+    file_fields = ('video_file', 'video_thumbnail')
+    string_fields = ('title', 'subtitle')
+    upload_fields = ('video_file', 'video_thumbnail')
+
+    def extra_data(self, video):
+        return {
             'has_video': bool(video.video_file),
             'has_thumbnail': bool(video.video_thumbnail),
-            'order': video.order,
-            'is_active': video.is_active,
         }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
 
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def delete_video_section(request, item_id):
-    try:
-        video = get_object_or_404(VideoSection, id=item_id)
-        video.delete()
-        return JsonResponse({'success': True, 'message': 'Video section deleted successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+class CarouselSlideAPIView(StaffJsonView):
+    model = CarouselSlide
+    label = 'Carousel slide'
+    schema = CAROUSEL_SLIDE_SCHEMA
+    file_fields = ('background_image',)
+    string_fields = (
+        'title', 'subtitle', 'description', 'button_text', 'button_url',
+        'background_color', 'text_color',
+    )
+    string_defaults = {'background_color': '#000000', 'text_color': '#ffffff'}
+    upload_fields = ('background_image',)
 
+    def extra_data(self, slide):
+        return {'has_background_image': bool(slide.background_image)}
 
-@login_required
-@user_passes_test(is_staff)
-@require_POST
-def save_carousel_slide(request):
-    try:
-        item_id = request.POST.get('item_id')
-        if item_id:
-            slide = get_object_or_404(CarouselSlide, id=item_id)
-        else:
-            slide = CarouselSlide()
-
-        slide.title = request.POST.get('title', '')
-        slide.subtitle = request.POST.get('subtitle', '')
-        slide.description = request.POST.get('description', '')
-        slide.button_text = request.POST.get('button_text', '')
-        slide.button_url = request.POST.get('button_url', '')
-        slide.background_color = request.POST.get('background_color', '#000000')
-        slide.text_color = request.POST.get('text_color', '#ffffff')
-
-        if 'background_image' in request.FILES:
-            slide.background_image = request.FILES['background_image']
-
-        slide.order = int(request.POST.get('order', 0))
-        slide.is_active = request.POST.get('is_active') == 'on'
-        slide.save()
-
-        return JsonResponse({'success': True, 'message': 'Carousel slide saved successfully'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
 
-
-@login_required
-@user_passes_test(is_staff)
-def get_carousel_slide(request, item_id):
-    try:
-        slide = get_object_or_404(CarouselSlide, id=item_id)
-        data = {
-            'id': slide.id,
-            'title': slide.title,
-            'subtitle': slide.subtitle,
-            'description': slide.description,
-            'button_text': slide.button_text,
-            'button_url': slide.button_url,
-            'background_color': slide.background_color,
-            'text_color': slide.text_color,
-            'has_background_image': bool(slide.background_image),
-            'order': slide.order,
-            'is_active': slide.is_active,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+# Section key (same as dashboard_state) -> API view for bulk operations
+SECTION_API_VIEWS = {
+    'carousel': CarouselSlideAPIView,
+    'hero': HeroSectionAPIView,
+    'statistics': StatisticAPIView,
+    'features': FeatureAPIView,
+    'steps': StepAPIView,
+    'testimonials': TestimonialAPIView,
+    'demo_voices': DemoVoiceAPIView,
+    'pricing': PricingPlanAPIView,
+    'faqs': FAQAPIView,
+    'usecases': UseCaseAPIView,
+    'video': VideoSectionAPIView,
+}
 
 
 @login_required
 @user_passes_test(is_staff)
 @require_POST
-def delete_carousel_slide(request, item_id):
-    try:
-        slide = get_object_or_404(CarouselSlide, id=item_id)
-        slide.delete()
-        return JsonResponse({'success': True, 'message': 'Carousel slide deleted successfully'})
+def bulk_delete(request):
+    """
+    Delete items from several sections at once
+    Body: {"<section key>": [ids], ...} - one DELETE query per section
+    """
+    try:
+        payload = json.loads(request.body)
+        unknown = [kind for kind in payload if kind not in SECTION_API_VIEWS]
+        if unknown:
+            return JsonResponse({'success': False, 'error': f'Unknown sections: {", ".join(unknown)}'})
+
+        deleted = {}
+        stored_files = []
+        with transaction.atomic():
+            for kind, ids in payload.items():
+                view_class = SECTION_API_VIEWS[kind]
+                queryset = view_class.model.objects.filter(id__in=ids)
+                if view_class.file_fields:
+                    for row in queryset.values_list(*view_class.file_fields):
+                        stored_files.extend(name for name in row if name)
+                _, per_model = queryset.delete()
+                deleted[kind] = per_model.get(view_class.model._meta.label, 0)
+
+        # Remove media only once the rows are gone
+        for name in stored_files:
+            default_storage.delete(name)
+
+        return JsonResponse({'success': True, 'deleted': deleted})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
@@ -1,18 +1,75 @@
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, escape
+from django.utils.safestring import mark_safe
 from django.utils import timezone
 from django.urls import path, reverse
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from django.views.decorators.gzip import gzip_page
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
 import json
+import uuid
 from .models import Payment, CreditPackage, Subscription, PaymentWebhook, ManualPaymentRequest
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+# Status badge colors and labels, built once instead of on every changelist row
+PAYMENT_STATUS_COLORS = {
+    'pending': '#ffc107',
+    'processing': '#17a2b8',
+    'completed': '#28a745',
+    'failed': '#dc3545',
+    'refunded': '#6c757d'
+}
+PAYMENT_STATUS_LABELS = dict(Payment._meta.get_field('status').choices)
+
+MANUAL_PAYMENT_STATUS_COLORS = {
+    'pending': '#ffc107',
+    'approved': '#28a745',
+    'rejected': '#dc3545'
+}
+MANUAL_PAYMENT_STATUS_LABELS = dict(ManualPaymentRequest._meta.get_field('status').choices)
+
+_BADGE_TEMPLATE = '<span style="background-color: %s; color: white; padding: 3px 10px; border-radius: 3px;">%s</span>'
+_SCREENSHOT_TEMPLATE = '<img src="%s" style="max-width: 300px; max-height: 300px;" />'
+_RESPONSE_BUTTON_TEMPLATE = (
+    '<button type="button" data-url="%s" onclick="openPaymentResponse(this)" '
+    'style="background: #007bff; color: white; border: none; padding: 5px 10px; '
+    'border-radius: 3px; cursor: pointer; font-size: 12px;">View Response</button>'
+)
+_NO_RESPONSE_HTML = mark_safe('<span style="color: #999;">No Data</span>')
+
+
+def _status_badge(color, label):
+    return mark_safe(_BADGE_TEMPLATE % (color, escape(label)))
+
+
+def _status_badges(colors, labels):
+    """Pre-render the badge HTML for every known status"""
+    return {status: _status_badge(colors.get(status, '#6c757d'), label) for status, label in labels.items()}
+
+
+PAYMENT_STATUS_BADGES = _status_badges(PAYMENT_STATUS_COLORS, PAYMENT_STATUS_LABELS)
+MANUAL_PAYMENT_STATUS_BADGES = _status_badges(MANUAL_PAYMENT_STATUS_COLORS, MANUAL_PAYMENT_STATUS_LABELS)
+
+
+def _pretty_json(data):
+    """Indented JSON for admin display (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode()
+    return json.dumps(data, indent=2, default=str)
+
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ['transaction_id', 'user', 'amount', 'payment_method', 'status_badge', 'view_response_btn', 'created_at']
     list_filter = ['payment_method', 'payment_type', 'status', 'created_at']
-    search_fields = ['transaction_id', 'user__email']
+    search_fields = ['transaction_id', 'user_email']
     readonly_fields = ['id', 'created_at', 'gateway_response_display', 'error_details']
 
     fieldsets = (
@@ -35,47 +92,35 @@ class PaymentAdmin(admin.ModelAdmin):
         }),
     )
 
-    def status_badge(self, obj):
-        colors = {
-            'pending': '#ffc107',
-            'processing': '#17a2b8',
-            'completed': '#28a745',
-            'failed': '#dc3545',
-            'refunded': '#6c757d'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.status, '#6c757d'),
-            obj.get_status_display()
+    class Media:
+        js = ('admin/payments/payment_response.js',)
+
+    def get_queryset(self, request):
+        # The JSON blob is only read on the detail page / response API; the
+        # changelist just needs to know whether one exists
+        return super().get_queryset(request).select_related('user', 'package', 'plan').defer(
+            'gateway_response'
+        ).annotate(
+            has_gateway_response=ExpressionWrapper(
+                Q(gateway_response__isnull=False) & ~Q(gateway_response={}),
+                output_field=BooleanField()
+            )
         )
+
+    def status_badge(self, obj):
+        return PAYMENT_STATUS_BADGES.get(obj.status) or _status_badge('#6c757d', obj.status)
     status_badge.short_description = 'Status'
 
     def view_response_btn(self, obj):
-        if obj.gateway_response:
-            # Escape JSON for safe embedding in HTML
-            json_data = json.dumps(obj.gateway_response, indent=2, default=str)
-            escaped_json = json_data.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-
-            return format_html(
-                '''<button type="button"
-                    onclick="var w=window.open('','Payment Response','width=800,height=600,scrollbars=yes');
-                    w.document.write('<html><head><title>{} Response</title><style>body{{font-family:monospace;padding:20px;background:#1e1e1e;color:#d4d4d4;}}pre{{white-space:pre-wrap;word-wrap:break-word;}}</style></head><body><h2 style=\\'color:#4fc3f7\\'>{} Payment Response</h2><p><strong>Transaction ID:</strong> {}</p><p><strong>Amount:</strong> ${}</p><p><strong>Status:</strong> {}</p><hr><h3 style=\\'color:#81c784\\'>Gateway Response:</h3><pre>{}</pre></body></html>');
-                    w.document.close();"
-                    style="background: #007bff; color: white; border: none; padding: 5px 10px;
-                    border-radius: 3px; cursor: pointer; font-size: 12px;">View Response</button>''',
-                obj.payment_method.upper(),
-                obj.payment_method.upper(),
-                obj.transaction_id or 'N/A',
-                obj.amount,
-                obj.status,
-                escaped_json
-            )
-        return format_html('<span style="color: #999;">No Data</span>')
+        if obj.has_gateway_response:
+            # The JSON is fetched on click by payment_response.js
+            return mark_safe(_RESPONSE_BUTTON_TEMPLATE % escape(reverse('admin:payment-response-api', args=[obj.id])))
+        return _NO_RESPONSE_HTML
     view_response_btn.short_description = 'API Response'
 
     def gateway_response_display(self, obj):
         if obj.gateway_response:
-            formatted_json = json.dumps(obj.gateway_response, indent=2, default=str)
+            formatted_json = _pretty_json(obj.gateway_response)
             return format_html(
                 '<pre style="background: #f5f5f5; padding: 15px; border-radius: 5px; '
                 'max-height: 400px; overflow: auto; font-size: 12px;">{}</pre>',
@@ -99,7 +144,8 @@ class PaymentAdmin(admin.ModelAdmin):
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
-            path('api/response/<uuid:payment_id>/', self.admin_site.admin_view(self.get_payment_response), name='payment-response-api'),
+            # Gateway payloads can be several KB; gzip_page skips bodies under 200 bytes
+            path('api/response/<uuid:payment_id>/', self.admin_site.admin_view(gzip_page(self.get_payment_response)), name='payment-response-api'),
         ]
         return custom_urls + urls
 
@@ -133,6 +179,9 @@ class SubscriptionAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'subscription_id']
     readonly_fields = ['id', 'created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'plan')
+
 
 @admin.register(ManualPaymentRequest)
 class ManualPaymentRequestAdmin(admin.ModelAdmin):
@@ -163,22 +212,16 @@ class ManualPaymentRequestAdmin(admin.ModelAdmin):
 
     actions = ['approve_payments', 'reject_payments']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'package', 'plan', 'reviewed_by')
+
     def status_badge(self, obj):
-        colors = {
-            'pending': '#ffc107',
-            'approved': '#28a745',
-            'rejected': '#dc3545'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.status, '#6c757d'),
-            obj.get_status_display()
-        )
+        return MANUAL_PAYMENT_STATUS_BADGES.get(obj.status) or _status_badge('#6c757d', obj.status)
     status_badge.short_description = 'Status'
 
     def screenshot_preview(self, obj):
         if obj.payment_screenshot:
-            return format_html('<img src="{}" style="max-width: 300px; max-height: 300px;" />', obj.payment_screenshot.url)
+            return mark_safe(_SCREENSHOT_TEMPLATE % escape(obj.payment_screenshot.url))
         return "No screenshot uploaded"
     screenshot_preview.short_description = 'Payment Screenshot'
 
@@ -187,59 +230,71 @@ class ManualPaymentRequestAdmin(admin.ModelAdmin):
         from accounts.models import User
         from datetime import timedelta
 
-        approved_count = 0
-        for payment_request in queryset.filter(status='pending'):
+        # One timestamp for the whole batch
+        now = timezone.now()
+        subscription_ends = {
+            'yearly': now + timedelta(days=365),
+            'free': now + timedelta(days=365 * 100),  # Free plan never expires
+        }
+        monthly_end = now + timedelta(days=30)  # Monthly plans (starter, basic, pro)
+
+        pending = list(queryset.filter(status='pending').select_related('user', 'plan', 'package'))
+
+        # Plans in this batch (already joined above) and their end dates, resolved once per plan
+        plans = {pr.plan_id: pr.plan for pr in pending if pr.plan_id}
+        plan_ends = {
+            # Default to 30 days (monthly) for most plans
+            plan_id: subscription_ends.get(plan.plan_type, monthly_end)
+            for plan_id, plan in plans.items()
+        }
+
+        users = {}
+        plan_user_ids = set()
+        credit_deltas = {}
+        subscription_values = {}
+        payments_to_create = []
+
+        for payment_request in pending:
             # Update status
             payment_request.status = 'approved'
             payment_request.reviewed_by = request.user
-            payment_request.reviewed_at = timezone.now()
+            payment_request.reviewed_at = now
 
-            user = payment_request.user
+            # One instance per user so several requests from the same user accumulate
+            user = users.setdefault(payment_request.user_id, payment_request.user)
 
             # Handle Subscription Plan Upgrade
-            if payment_request.payment_type == 'subscription' and payment_request.plan:
-                plan = payment_request.plan
+            if payment_request.payment_type == 'subscription' and payment_request.plan_id:
+                plan = plans[payment_request.plan_id]
+                plan_user_ids.add(user.id)
 
                 # Update user's subscription plan (both ForeignKey and CharField)
                 user.subscription_plan = plan
                 user.subscription_type = plan.plan_type  # Update the CharField that UI displays
-                user.subscription_start = timezone.now()
 
                 # Set subscription end date based on plan type
-                # Default to 30 days (monthly) for most plans
-                if plan.plan_type == 'yearly':
-                    user.subscription_end = timezone.now() + timedelta(days=365)
-                elif plan.plan_type == 'free':
-                    # Free plan never expires
-                    user.subscription_end = timezone.now() + timedelta(days=365 * 100)
-                else:
-                    # Monthly plans (starter, basic, pro)
-                    user.subscription_end = timezone.now() + timedelta(days=30)
-
-                user.save()
-
-                # Create or update Subscription record
-                Subscription.objects.update_or_create(
-                    user=user,
-                    defaults={
-                        'plan': plan,
-                        'status': 'active',
-                        'start_date': timezone.now(),
-                        'end_date': user.subscription_end,
-                        'payment_method': payment_request.payment_method,
-                        'auto_renew': False,  # Manual payments don't auto-renew
-                    }
-                )
+                user.subscription_end_date = plan_ends[plan.id]
+
+                # Subscription record values, written in bulk below
+                subscription_values[user.id] = {
+                    'plan': plan,
+                    'status': 'active',
+                    'start_date': now,
+                    'end_date': user.subscription_end_date,
+                    'payment_method': payment_request.payment_method,
+                    'auto_renew': False,  # Manual payments don't auto-renew
+                }
 
             # Award credits if not already awarded
             if not payment_request.credits_awarded and payment_request.credits_to_award > 0:
-                user.credits += payment_request.credits_to_award
-                user.save()
+                # Applied as F() increments below so concurrent credit changes are kept
+                credit_deltas[user.id] = credit_deltas.get(user.id, 0) + payment_request.credits_to_award
                 payment_request.credits_awarded = True
 
-                # Create Payment record for tracking
-                Payment.objects.create(
+                # Payment record for tracking
+                payments_to_create.append(Payment(
                     user=user,
+                    user_email=user.email,  # bulk_create skips save()
                     amount=payment_request.amount,
                     currency=payment_request.currency,
                     payment_method=payment_request.payment_method,
@@ -247,15 +302,60 @@ class ManualPaymentRequestAdmin(admin.ModelAdmin):
                     status='completed',
                     transaction_id=f"MANUAL_{payment_request.transaction_id}",
                     credits_awarded=payment_request.credits_to_award,
-                    completed_at=timezone.now()
-                )
-
-            payment_request.save()
-            approved_count += 1
+                    completed_at=now
+                ))
+
+        # Users receiving the same amount share one UPDATE ... SET credits = credits + n
+        users_by_delta = {}
+        for user_id, delta in credit_deltas.items():
+            users_by_delta.setdefault(delta, []).append(user_id)
+
+        with transaction.atomic():
+            User.objects.bulk_update(
+                [users[user_id] for user_id in plan_user_ids],
+                ['subscription_plan', 'subscription_type', 'subscription_end_date']
+            )
+            for delta, user_ids in users_by_delta.items():
+                User.objects.filter(id__in=user_ids).update(credits=F('credits') + delta)
+            self._save_subscriptions(subscription_values, now)
+            Payment.objects.bulk_create(payments_to_create)
+            ManualPaymentRequest.objects.bulk_update(
+                pending, ['status', 'reviewed_by', 'reviewed_at', 'credits_awarded']
+            )
 
-        self.message_user(request, f'{approved_count} payment(s) approved successfully.', messages.SUCCESS)
+        self.message_user(request, f'{len(pending)} payment(s) approved successfully.', messages.SUCCESS)
     approve_payments.short_description = 'Approve selected payments'
 
+    def _save_subscriptions(self, subscription_values, now):
+        """Create or update one Subscription per user (user id -> field values)"""
+        if not subscription_values:
+            return
+
+        latest = {}
+        # Default ordering is newest first; update the latest subscription
+        for user_id, subscription_id in Subscription.objects.filter(
+            user_id__in=subscription_values
+        ).values_list('user_id', 'id'):
+            latest.setdefault(user_id, subscription_id)
+
+        # Users getting identical values share one plain UPDATE ... WHERE id IN (...)
+        updates = {}
+        to_create = []
+        for user_id, values in subscription_values.items():
+            subscription_id = latest.get(user_id)
+            if subscription_id is None:
+                to_create.append(Subscription(
+                    user_id=user_id,
+                    subscription_id=f"SUB_{values['payment_method'].upper()}_{user_id}_{uuid.uuid4().hex[:8]}",
+                    **values
+                ))
+            else:
+                updates.setdefault(tuple(values.items()), []).append(subscription_id)
+
+        for values, subscription_ids in updates.items():
+            Subscription.objects.filter(id__in=subscription_ids).update(updated_at=now, **dict(values))
+        Subscription.objects.bulk_create(to_create)
+
     def reject_payments(self, request, queryset):
         from django.contrib import messages
 
@@ -274,3 +374,7 @@ class PaymentWebhookAdmin(admin.ModelAdmin):
     list_filter = ['payment_method', 'processed', 'created_at']
     search_fields = ['event_type', 'error_message']
     readonly_fields = ['id', 'created_at', 'processed_at']
+
+    def get_queryset(self, request):
+        # Webhook payloads are only shown on the detail page
+        return super().get_queryset(request).defer('payload')
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_error_code_payment_error_message_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status'], name='payment_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_method'], name='payment_method_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-created_at'], name='payment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['user', '-created_at'], name='payment_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'end_date'], name='subscription_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'status'], name='subscription_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manualpaymentrequest',
+            index=models.Index(fields=['status', '-created_at'], name='manual_payment_status_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+#
+# GIN indexes for containment/key lookups inside the JSON columns.
+# They only exist on PostgreSQL (where JSONField is jsonb); SQLite and MySQL
+# deployments skip this migration's SQL.
+
+from django.db import migrations
+
+
+GIN_INDEXES = [
+    ('payment_gateway_resp_gin', 'payments_payment', 'gateway_response'),
+    ('paymentwebhook_payload_gin', 'payments_paymentwebhook', 'payload'),
+]
+
+
+def create_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" jsonb_path_ops)'
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_payment_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
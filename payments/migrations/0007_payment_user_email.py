@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+#
+# Denormalized Payment.user_email for admin search without joining accounts_user.
+# On PostgreSQL a trigram index on UPPER(user_email) also serves the
+# icontains lookups the admin search box generates.
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_user_email(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    User = apps.get_model('accounts', 'User')
+    # One UPDATE ... SET user_email = (SELECT email ...) instead of a row loop
+    Payment.objects.update(
+        user_email=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('email')[:1])
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "payment_user_email_trgm" ON "payments_payment" '
+        'USING gin (UPPER("user_email") gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "payment_user_email_trgm"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_alter_user_subscription_type'),
+        ('payments', '0006_json_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='user_email',
+            field=models.CharField(blank=True, db_index=True, max_length=254),
+        ),
+        migrations.RunPython(backfill_user_email, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_payment_user_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='manualpaymentrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-created_at'], name='mpr_pending_idx'),
+        ),
+    ]
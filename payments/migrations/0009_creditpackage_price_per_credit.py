@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+def backfill_price_per_credit(apps, schema_editor):
+    CreditPackage = apps.get_model('payments', 'CreditPackage')
+    packages = list(CreditPackage.objects.all())
+    for package in packages:
+        package.price_per_credit = float(package.price) / package.credits if package.credits > 0 else 0
+    CreditPackage.objects.bulk_update(packages, ['price_per_credit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_manualpaymentrequest_pending_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creditpackage',
+            name='price_per_credit',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_price_per_credit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+def backfill_event_id(apps, schema_editor):
+    PaymentWebhook = apps.get_model('payments', 'PaymentWebhook')
+    seen = set()
+    webhooks = []
+    # Oldest delivery keeps the id; later redeliveries stay NULL
+    for webhook in PaymentWebhook.objects.order_by('created_at').only('id', 'payload').iterator():
+        event_id = webhook.payload.get('id') if isinstance(webhook.payload, dict) else None
+        if not event_id or event_id in seen:
+            continue
+        seen.add(event_id)
+        webhook.event_id = event_id
+        webhooks.append(webhook)
+    PaymentWebhook.objects.bulk_update(webhooks, ['event_id'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_creditpackage_price_per_credit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentwebhook',
+            name='event_id',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_event_id, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+#
+# TOAST the JSON columns with lz4 instead of pglz: smaller and faster to
+# decompress when payment history and admin pages read them. Needs PostgreSQL 14+
+# built with lz4; other databases and servers skip this migration's SQL.
+# Existing values keep their compression until they are rewritten.
+
+from django.db import migrations
+
+
+JSON_COLUMNS = [
+    ('payments_payment', 'gateway_response'),
+    ('payments_paymentwebhook', 'payload'),
+]
+
+
+def _lz4_available(connection):
+    if connection.vendor != 'postgresql' or connection.pg_version < 140000:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_settings WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)"
+        )
+        return cursor.fetchone() is not None
+
+
+def set_lz4_compression(apps, schema_editor):
+    if not _lz4_available(schema_editor.connection):
+        return
+    for table, column in JSON_COLUMNS:
+        schema_editor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET COMPRESSION lz4')
+
+
+def reset_compression(apps, schema_editor):
+    if not _lz4_available(schema_editor.connection):
+        return
+    for table, column in JSON_COLUMNS:
+        schema_editor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET COMPRESSION default')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_paymentwebhook_event_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_lz4_compression, reset_compression),
+    ]
@@ -1,7 +1,6 @@
 from django.db import models
 from django.conf import settings
 import uuid
-from voice_cloning.compression_utils import compress_image
 
 
 class Payment(models.Model):
@@ -12,6 +11,8 @@ class Payment(models.Model):
         on_delete=models.CASCADE,
         related_name='payments'
     )
+    # Copy of user.email so admin search stays on this table
+    user_email = models.CharField(max_length=254, blank=True, db_index=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=3, default='USD')
     payment_method = models.CharField(
@@ -76,6 +77,18 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status'], name='payment_status_idx'),
+            models.Index(fields=['payment_method'], name='payment_method_idx'),
+            models.Index(fields=['-created_at'], name='payment_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='payment_user_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep user_email in sync; only hit the DB for the user when it is missing
+        if self.user_id and (not self.user_email or Payment.user.is_cached(self)):
+            self.user_email = self.user.email
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.email} - {self.payment_method} - ${self.amount}"
@@ -91,18 +104,18 @@ class CreditPackage(models.Model):
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     is_popular = models.BooleanField(default=False)
+    # Stored so packages can be ordered by value in the database
+    price_per_credit = models.FloatField(default=0, editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # Calculate price per credit
+        self.price_per_credit = float(self.price) / self.credits if self.credits > 0 else 0
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} - {self.credits} credits - ${self.price}"
 
-    @property
-    def price_per_credit(self):
-        """Calculate price per credit"""
-        if self.credits > 0:
-            return float(self.price) / self.credits
-        return 0
-
 
 class Subscription(models.Model):
     """User subscriptions"""
@@ -148,6 +161,10 @@ class Subscription(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'end_date'], name='subscription_status_end_idx'),
+            models.Index(fields=['user', 'status'], name='subscription_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.plan.name} - {self.status}"
@@ -234,12 +251,11 @@ class ManualPaymentRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = "Manual Payment Request"
         verbose_name_plural = "Manual Payment Requests"
-
-    def save(self, *args, **kwargs):
-        # Compress payment screenshot if uploaded
-        if self.payment_screenshot and hasattr(self.payment_screenshot, 'file'):
-            self.payment_screenshot = compress_image(self.payment_screenshot, quality=90, max_width=1920, max_height=1080)
-        super().save(*args, **kwargs)
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='manual_payment_status_idx'),
+            # Approval queue only; skipped on MySQL, which has no partial indexes
+            models.Index(fields=['-created_at'], name='mpr_pending_idx', condition=models.Q(status='pending')),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.payment_method} - {self.amount} PKR - {self.status}"
@@ -249,6 +265,7 @@ class PaymentWebhook(models.Model):
     """Store webhook events from payment gateways"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     payment_method = models.CharField(max_length=20)
+    event_id = models.CharField(max_length=255, unique=True, null=True, blank=True)  # Gateway event id, for dedupe
     event_type = models.CharField(max_length=100)
     payload = models.JSONField()
     processed = models.BooleanField(default=False)
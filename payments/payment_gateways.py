@@ -8,12 +8,70 @@ import stripe
 import hashlib
 import hmac
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import time
 import uuid
-from decimal import Decimal
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
 from django.conf import settings
+from django.core.cache import cache
 from typing import Dict, Optional
 import json
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+# Refresh cached PayPal tokens this many seconds before PayPal expires them
+PAYPAL_TOKEN_EXPIRY_MARGIN = 120
+
+# (connect, read) timeout for PayPal API calls
+PAYPAL_TIMEOUT = (3.05, 10)
+
+PAYPAL_TOKEN_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Language': 'en_US',
+}
+PAYPAL_TOKEN_DATA = {'grant_type': 'client_credentials'}
+PAYPAL_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def _build_paypal_session() -> requests.Session:
+    """Process-wide session so PayPal calls reuse keep-alive TLS connections"""
+    session = requests.Session()
+    # Retry only covers idempotent methods (urllib3 default), so captures are never replayed
+    retries = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retries))
+    return session
+
+
+_paypal_session = _build_paypal_session()
+
+
+def to_minor_units(amount) -> int:
+    """Convert an amount (Decimal, float or str) to integer cents/paisas, rounding half up"""
+    if not isinstance(amount, Decimal):
+        # str() first so floats like 10.29 don't become 1028.99...
+        amount = Decimal(str(amount))
+    return int((amount * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def format_minor_units(amount_minor: int) -> str:
+    """Format integer cents as a 2-decimal string, e.g. 1050 -> '10.50'"""
+    return f"{amount_minor // 100}.{amount_minor % 100:02d}"
+
+
+@lru_cache(maxsize=256)
+def usd_to_pkr(amount, usd_to_pkr_rate) -> Decimal:
+    """Convert a USD amount to PKR at the given rate, rounded half up to paisas"""
+    # The rate is part of the key, so a settings change never serves a stale amount
+    return (Decimal(str(amount)) * Decimal(str(usd_to_pkr_rate))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
 
 class PaymentGatewayError(Exception):
     """Custom exception for payment gateway errors"""
@@ -24,12 +82,15 @@ class StripeGateway:
     """Stripe Payment Gateway"""
 
     def __init__(self, use_dynamic_settings=True):
+        # Passed per call instead of assigning the module-global stripe.api_key
         if use_dynamic_settings:
             from accounts.models import PlatformSettings
             platform_settings = PlatformSettings.get_settings()
-            stripe.api_key = platform_settings.stripe_secret_key or settings.STRIPE_SECRET_KEY
+            self.api_key = platform_settings.stripe_secret_key or settings.STRIPE_SECRET_KEY
+            self.webhook_secret = platform_settings.stripe_webhook_secret or settings.STRIPE_WEBHOOK_SECRET
         else:
-            stripe.api_key = settings.STRIPE_SECRET_KEY
+            self.api_key = settings.STRIPE_SECRET_KEY
+            self.webhook_secret = settings.STRIPE_WEBHOOK_SECRET
 
     def create_payment_intent(self, amount: Decimal, currency: str = 'usd',
                             metadata: Optional[Dict] = None) -> Dict:
@@ -46,7 +107,8 @@ class StripeGateway:
         """
         try:
             intent = stripe.PaymentIntent.create(
-                amount=int(amount * 100),  # Convert to cents
+                api_key=self.api_key,
+                amount=to_minor_units(amount),  # Convert to cents
                 currency=currency.lower(),
                 metadata=metadata or {},
                 automatic_payment_methods={
@@ -67,7 +129,7 @@ class StripeGateway:
     def retrieve_payment_intent(self, payment_intent_id: str) -> Dict:
         """Retrieve payment intent status"""
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            intent = stripe.PaymentIntent.retrieve(payment_intent_id, api_key=self.api_key)
             return {
                 'success': True,
                 'status': intent.status,
@@ -84,6 +146,7 @@ class StripeGateway:
         """Create Stripe Checkout Session"""
         try:
             session = stripe.checkout.Session.create(
+                api_key=self.api_key,
                 payment_method_types=['card'],
                 line_items=[{
                     'price_data': {
@@ -91,7 +154,7 @@ class StripeGateway:
                         'product_data': {
                             'name': 'Talk Studio Credits',
                         },
-                        'unit_amount': int(amount * 100),
+                        'unit_amount': to_minor_units(amount),
                     },
                     'quantity': 1,
                 }],
@@ -113,7 +176,7 @@ class StripeGateway:
         """Verify Stripe webhook signature"""
         try:
             event = stripe.Webhook.construct_event(
-                payload, signature, settings.STRIPE_WEBHOOK_SECRET
+                payload, signature, self.webhook_secret
             )
             return {'success': True, 'event': event}
         except ValueError:
@@ -122,6 +185,29 @@ class StripeGateway:
             raise PaymentGatewayError("Invalid signature")
 
 
+def _dump_json(payload: Dict) -> bytes:
+    """Encode a PayPal request body (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+def _load_json(response: requests.Response) -> Dict:
+    """Decode a PayPal response body (orjson when available)"""
+    if orjson is None:
+        return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        # Same RequestException family response.json() raises, so callers' handlers still apply
+        raise requests.exceptions.InvalidJSONError(str(e), response=response)
+
+
+def _links_by_rel(data: Dict) -> Dict:
+    """HATEOAS links of a PayPal response keyed by rel ('approve', 'self', 'capture', ...)"""
+    return {link['rel']: link['href'] for link in data.get('links', [])}
+
+
 class PayPalGateway:
     """PayPal Payment Gateway"""
 
@@ -143,45 +229,88 @@ class PayPalGateway:
             if self.mode == 'sandbox'
             else 'https://api-m.paypal.com'
         )
+        self._token_url = f"{self.base_url}/v1/oauth2/token"
+        self._auth = (self.client_id, self.client_secret)
+        # (token, headers) for the last token used, swapped as one tuple
+        self._bearer = (None, None)
+
+    @property
+    def _token_cache_key(self) -> str:
+        # Hash the credentials so the client id never shows up in the cache backend
+        digest = hashlib.md5(f"{self.mode}:{self.client_id}".encode()).hexdigest()
+        return f"paypal_token:{digest}"
 
     def _get_access_token(self) -> str:
-        """Get PayPal OAuth access token"""
-        url = f"{self.base_url}/v1/oauth2/token"
-        headers = {
-            'Accept': 'application/json',
-            'Accept-Language': 'en_US',
-        }
-        data = {'grant_type': 'client_credentials'}
+        """Get PayPal OAuth access token (cached until shortly before it expires)"""
+        cache_key = self._token_cache_key
+        token = cache.get(cache_key)
+        if token:
+            return token
+
+        # Only one worker refreshes; the others wait briefly for its token
+        lock_key = f"{cache_key}:lock"
+        locked = cache.add(lock_key, True, timeout=10)
+        if not locked:
+            time.sleep(0.5)
+            token = cache.get(cache_key)
+            if token:
+                return token
 
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                data=data,
-                auth=(self.client_id, self.client_secret)
+            response = _paypal_session.post(
+                self._token_url,
+                headers=PAYPAL_TOKEN_HEADERS,
+                data=PAYPAL_TOKEN_DATA,
+                auth=self._auth,
+                timeout=PAYPAL_TIMEOUT
             )
             response.raise_for_status()
-            return response.json()['access_token']
+            token_data = _load_json(response)
+            token = token_data['access_token']
+            timeout = int(token_data.get('expires_in', 0)) - PAYPAL_TOKEN_EXPIRY_MARGIN
+            if timeout > 0:
+                cache.set(cache_key, token, timeout=timeout)
+            return token
         except requests.exceptions.RequestException as e:
             raise PaymentGatewayError(f"PayPal auth error: {str(e)}")
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+    def invalidate_token(self):
+        """Drop the cached access token so the next call fetches a new one"""
+        cache.delete(self._token_cache_key)
+
+    def _auth_headers(self, headers: Optional[Dict] = None) -> Dict:
+        """Authorization header for the current token, rebuilt only when the token changes"""
+        token = self._get_access_token()
+        cached_token, bearer = self._bearer
+        if cached_token != token:
+            bearer = {'Authorization': f'Bearer {token}'}
+            self._bearer = (token, bearer)
+        return {**headers, **bearer} if headers else bearer
+
+    def _send(self, method: str, url: str, headers: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """Send an authorized API request, refreshing a stale cached token once on 401"""
+        for attempt in range(2):
+            response = _paypal_session.request(
+                method, url, headers=self._auth_headers(headers), timeout=PAYPAL_TIMEOUT, **kwargs
+            )
+            if response.status_code != 401 or attempt:
+                return response
+            self.invalidate_token()
 
     def create_order(self, amount: Decimal, currency: str = 'USD',
                     return_url: str = '', cancel_url: str = '') -> Dict:
         """Create PayPal order"""
-        access_token = self._get_access_token()
-
         url = f"{self.base_url}/v2/checkout/orders"
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {access_token}'
-        }
 
         payload = {
             'intent': 'CAPTURE',
             'purchase_units': [{
                 'amount': {
                     'currency_code': currency.upper(),
-                    'value': str(amount)
+                    'value': format_minor_units(to_minor_units(amount))
                 },
                 'description': 'Talk Studio Credits'
             }],
@@ -194,21 +323,17 @@ class PayPalGateway:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self._send('POST', url, data=_dump_json(payload), headers=PAYPAL_JSON_HEADERS)
             response.raise_for_status()
-            data = response.json()
+            data = _load_json(response)
 
-            # Get approval URL
-            approval_url = next(
-                (link['href'] for link in data.get('links', [])
-                 if link['rel'] == 'approve'),
-                None
-            )
+            links = _links_by_rel(data)
 
             return {
                 'success': True,
                 'order_id': data['id'],
-                'approval_url': approval_url,
+                'approval_url': links.get('approve'),
+                'links': links,
                 'status': data['status']
             }
         except requests.exceptions.RequestException as e:
@@ -216,42 +341,35 @@ class PayPalGateway:
 
     def capture_order(self, order_id: str) -> Dict:
         """Capture PayPal order payment"""
-        access_token = self._get_access_token()
-
         url = f"{self.base_url}/v2/checkout/orders/{order_id}/capture"
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {access_token}'
-        }
 
         try:
-            response = requests.post(url, headers=headers)
+            response = self._send('POST', url, headers=PAYPAL_JSON_HEADERS)
             response.raise_for_status()
-            data = response.json()
+            data = _load_json(response)
+            capture = data['purchase_units'][0]['payments']['captures'][0]
 
             return {
                 'success': True,
                 'order_id': data['id'],
                 'status': data['status'],
+                'capture_id': capture['id'],
                 'payer_email': data.get('payer', {}).get('email_address'),
-                'amount': data['purchase_units'][0]['payments']['captures'][0]['amount']['value']
+                'amount': capture['amount']['value'],
+                'currency': capture['amount']['currency_code'],
+                'create_time': capture.get('create_time'),
             }
         except requests.exceptions.RequestException as e:
             raise PaymentGatewayError(f"PayPal capture error: {str(e)}")
 
     def get_order(self, order_id: str) -> Dict:
         """Get PayPal order details"""
-        access_token = self._get_access_token()
-
         url = f"{self.base_url}/v2/checkout/orders/{order_id}"
-        headers = {
-            'Authorization': f'Bearer {access_token}'
-        }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = self._send('GET', url)
             response.raise_for_status()
-            data = response.json()
+            data = _load_json(response)
 
             return {
                 'success': True,
@@ -279,21 +397,32 @@ class JazzCashGateway:
             self.password = settings.JAZZCASH_PASSWORD
             self.integrity_salt = settings.JAZZCASH_INTEGRITY_SALT
 
+        # Key the HMAC once; each hash works on a copy
+        self._salt_bytes = self.integrity_salt.encode()
+        self._hmac = hmac.new(self._salt_bytes, digestmod=hashlib.sha256)
+
         self.base_url = 'https://payments.jazzcash.com.pk'
 
-    def _generate_hash(self, data: Dict) -> str:
-        """Generate HMAC-SHA256 hash for JazzCash"""
-        # Sort keys and create hash string
-        sorted_string = '&'.join([f"{k}={v}" for k, v in sorted(data.items())])
-        sorted_string += f"&{self.integrity_salt}"
+    @staticmethod
+    def _canonical_bytes(data: Dict) -> bytes:
+        """Sorted k1=v1&k2=v2... message that JazzCash signs"""
+        return b'&'.join(f"{k}={v}".encode() for k, v in sorted(data.items()))
+
+    def _generate_hash(self, data: Dict, message: Optional[bytes] = None) -> str:
+        """
+        Generate HMAC-SHA256 hash for JazzCash
 
-        hash_value = hmac.new(
-            self.integrity_salt.encode(),
-            sorted_string.encode(),
-            hashlib.sha256
-        ).hexdigest().upper()
+        Callers that already built the canonical message (e.g. to log or re-check it)
+        can pass it in to skip the sort + encode.
+        """
+        if message is None:
+            message = self._canonical_bytes(data)
 
-        return hash_value
+        mac = self._hmac.copy()
+        mac.update(message)
+        mac.update(b'&')
+        mac.update(self._salt_bytes)
+        return mac.hexdigest().upper()
 
     def create_transaction(self, amount: Decimal, currency: str = 'PKR',
                           return_url: str = '', mobile_number: str = '') -> Dict:
@@ -308,7 +437,7 @@ class JazzCashGateway:
             'pp_MerchantID': self.merchant_id,
             'pp_Password': self.password,
             'pp_TxnRefNo': transaction_id,
-            'pp_Amount': str(int(amount * 100)),  # Convert to paisas
+            'pp_Amount': str(to_minor_units(amount)),  # Convert to paisas
             'pp_TxnCurrency': currency,
             'pp_TxnDateTime': self._get_datetime(),
             'pp_BillReference': f"VC_{transaction_id}",
@@ -335,7 +464,8 @@ class JazzCashGateway:
         # Calculate expected hash
         expected_hash = self._generate_hash(response_data)
 
-        if received_hash != expected_hash:
+        # Constant-time; bytes so non-ASCII input is rejected rather than raising TypeError
+        if not hmac.compare_digest(received_hash.encode(), expected_hash.encode()):
             raise PaymentGatewayError("Invalid transaction hash")
 
         return {
@@ -349,7 +479,6 @@ class JazzCashGateway:
     @staticmethod
     def _get_datetime():
         """Get formatted datetime for JazzCash"""
-        from datetime import datetime
         return datetime.now().strftime('%Y%m%d%H%M%S')
 
 
@@ -366,18 +495,22 @@ class EasypaisaGateway:
             self.store_id = settings.EASYPAISA_STORE_ID
             self.password = settings.EASYPAISA_PASSWORD
 
+        self._password_bytes = self.password.encode()
+
         self.base_url = 'https://easypaisa.com.pk/easypay'
 
     def _generate_hash(self, data: str) -> str:
         """Generate hash for Easypaisa"""
-        hash_string = f"{data}{self.password}"
-        return hashlib.sha256(hash_string.encode()).hexdigest()
+        # Feed the hasher incrementally instead of building data + password
+        digest = hashlib.sha256(data.encode())
+        digest.update(self._password_bytes)
+        return digest.hexdigest()
 
     def create_transaction(self, amount: Decimal, currency: str = 'PKR',
                           return_url: str = '', account_number: str = '') -> Dict:
         """Create Easypaisa transaction"""
         transaction_id = f"EP{uuid.uuid4().hex[:18]}"
-        amount_str = str(int(amount * 100))  # Convert to paisas
+        amount_str = str(to_minor_units(amount))  # Convert to paisas
 
         # Create hash string
         hash_data = f"{self.store_id}{amount_str}{transaction_id}"
@@ -413,7 +546,7 @@ class EasypaisaGateway:
         expected_hash = self._generate_hash(hash_data)
         received_hash = response_data.get('postBackHash', '')
 
-        if expected_hash != received_hash:
+        if not hmac.compare_digest(expected_hash.encode(), received_hash.encode()):
             raise PaymentGatewayError("Invalid transaction hash")
 
         return {
@@ -427,16 +560,34 @@ class EasypaisaGateway:
     @staticmethod
     def _get_expiry_date():
         """Get expiry date (24 hours from now)"""
-        from datetime import datetime, timedelta
         expiry = datetime.now() + timedelta(days=1)
         return expiry.strftime('%Y%m%d %H%M%S')
 
 
+GATEWAY_CLASSES = {
+    'stripe': StripeGateway,
+    'paypal': PayPalGateway,
+    'jazzcash': JazzCashGateway,
+    'easypaisa': EasypaisaGateway,
+}
+
+_gateway_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def _build_gateway(gateway_type: str, settings_version):
+    """Construct a gateway once per platform settings version"""
+    return GATEWAY_CLASSES[gateway_type]()
+
+
 # Factory function to get payment gateway
 def get_payment_gateway(gateway_type: str):
     """
     Get payment gateway instance by type
 
+    Instances are shared until PlatformSettings is saved again, so credentials
+    changed in the admin take effect on the next call in every process.
+
     Args:
         gateway_type: One of 'stripe', 'paypal', 'jazzcash', 'easypaisa'
 
@@ -446,15 +597,18 @@ def get_payment_gateway(gateway_type: str):
     Raises:
         ValueError: If gateway_type is not supported
     """
-    gateways = {
-        'stripe': StripeGateway,
-        'paypal': PayPalGateway,
-        'jazzcash': JazzCashGateway,
-        'easypaisa': EasypaisaGateway,
-    }
-
-    gateway_class = gateways.get(gateway_type.lower())
-    if not gateway_class:
+    gateway_type = gateway_type.lower()
+    if gateway_type not in GATEWAY_CLASSES:
         raise ValueError(f"Unsupported payment gateway: {gateway_type}")
 
-    return gateway_class()
+    from accounts.models import PLATFORM_SETTINGS_CACHE_KEY, PlatformSettings
+
+    # The version comes from the row itself, not the per-process settings cache,
+    # so a secret rotated through another process is never reused for up to a minute
+    settings_version = PlatformSettings.objects.filter(pk=1).values_list('updated_at', flat=True).first()
+    if PlatformSettings.get_settings().updated_at != settings_version:
+        # This process still caches the old row; the gateway must be built from the new one
+        cache.delete(PLATFORM_SETTINGS_CACHE_KEY)
+
+    with _gateway_lock:
+        return _build_gateway(gateway_type, settings_version)
@@ -1,10 +1,29 @@
+import io
+from PIL import Image
 from rest_framework import serializers
 from .models import Payment, CreditPackage, Subscription, ManualPaymentRequest
 
 
+# Wallet gateways that need the payer's mobile number (method -> display name)
+MOBILE_PAYMENT_METHODS = {
+    'jazzcash': 'JazzCash',
+    'easypaisa': 'Easypaisa',
+}
+
+# Fields CreatePaymentSerializer requires per payment type / method: key -> ((field, purpose), ...)
+PAYMENT_TYPE_REQUIREMENTS = {
+    'credit': (('package_id', 'credit purchase'),),
+    'subscription': (('plan_id', 'subscription'),),
+}
+PAYMENT_METHOD_REQUIREMENTS = {
+    method: (('mobile_number', name),) for method, name in MOBILE_PAYMENT_METHODS.items()
+}
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     """Serializer for payments"""
-    user_email = serializers.EmailField(source='user.email', read_only=True)
+    # Denormalized column, no join to the user table
+    user_email = serializers.EmailField(read_only=True)
 
     class Meta:
         model = Payment
@@ -18,7 +37,6 @@ class PaymentSerializer(serializers.ModelSerializer):
 
 class CreditPackageSerializer(serializers.ModelSerializer):
     """Serializer for credit packages"""
-    price_per_credit = serializers.SerializerMethodField()
 
     class Meta:
         model = CreditPackage
@@ -27,10 +45,7 @@ class CreditPackageSerializer(serializers.ModelSerializer):
             'discount_percentage', 'description', 'is_popular',
             'is_active', 'price_per_credit', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
-
-    def get_price_per_credit(self, obj):
-        return obj.price_per_credit
+        read_only_fields = ['id', 'price_per_credit', 'created_at']
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -66,21 +81,13 @@ class CreatePaymentSerializer(serializers.Serializer):
     email = serializers.EmailField(required=False)
 
     def validate(self, data):
-        if data['payment_type'] == 'credit' and not data.get('package_id'):
-            raise serializers.ValidationError("package_id is required for credit purchase")
-
-        if data['payment_type'] == 'subscription' and not data.get('plan_id'):
-            raise serializers.ValidationError("plan_id is required for subscription")
-
-        # Validate JazzCash requirements
-        if data['payment_method'] == 'jazzcash':
-            if not data.get('mobile_number'):
-                raise serializers.ValidationError("mobile_number is required for JazzCash")
-
-        # Validate Easypaisa requirements
-        if data['payment_method'] == 'easypaisa':
-            if not data.get('mobile_number'):
-                raise serializers.ValidationError("mobile_number is required for Easypaisa")
+        requirements = (
+            PAYMENT_TYPE_REQUIREMENTS.get(data['payment_type'], ())
+            + PAYMENT_METHOD_REQUIREMENTS.get(data['payment_method'], ())
+        )
+        for field, purpose in requirements:
+            if not data.get(field):
+                raise serializers.ValidationError(f"{field} is required for {purpose}")
 
         return data
 
@@ -105,6 +112,33 @@ class ManualPaymentRequestSerializer(serializers.ModelSerializer):
                            'credits_awarded', 'created_at', 'reviewed_at']
 
 
+class ImageHeaderField(serializers.FileField):
+    """
+    Image upload field that only sniffs the image header
+
+    DRF's ImageField copies the whole upload into memory for Pillow. Here just the
+    first HEADER_BYTES are parsed; the full decode happens in the screenshot
+    compression task after the request.
+    """
+    # Phone JPEGs can carry ~64KB of EXIF before the frame header
+    HEADER_BYTES = 128 * 1024
+
+    default_error_messages = {
+        'invalid_image': serializers.ImageField.default_error_messages['invalid_image'],
+    }
+
+    def to_internal_value(self, data):
+        file_object = super().to_internal_value(data)
+        try:
+            file_object.seek(0)
+            header = file_object.read(self.HEADER_BYTES)
+            file_object.seek(0)
+            Image.open(io.BytesIO(header))
+        except Exception:
+            self.fail('invalid_image')
+        return file_object
+
+
 class CreateManualPaymentSerializer(serializers.Serializer):
     """Serializer for creating manual payment requests"""
     payment_method = serializers.ChoiceField(choices=['jazzcash', 'easypaisa'])
@@ -113,7 +147,7 @@ class CreateManualPaymentSerializer(serializers.Serializer):
     plan_id = serializers.IntegerField(required=False)
     transaction_id = serializers.CharField(max_length=255, required=False, allow_blank=True)
     account_number = serializers.CharField(max_length=20, required=False, allow_blank=True)
-    payment_screenshot = serializers.ImageField(required=True)
+    payment_screenshot = ImageHeaderField(required=True)
 
     def validate(self, data):
         if data['payment_type'] == 'credit' and not data.get('package_id'):
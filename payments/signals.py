@@ -0,0 +1,48 @@
+"""
+Signal handlers for payments
+"""
+import logging
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import CreditPackage, ManualPaymentRequest
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=ManualPaymentRequest)
+def queue_screenshot_compression(sender, instance, created, **kwargs):
+    """
+    Compress new payment screenshots in a Celery worker
+    Queued on commit so the worker never reads an uncommitted row
+    """
+    if not created or not instance.payment_screenshot:
+        return
+
+    from .tasks import compress_payment_screenshot
+
+    def enqueue():
+        try:
+            compress_payment_screenshot.delay(str(instance.id))
+        except Exception as e:
+            # Broker unavailable - keep the original screenshot
+            logger.warning(f"Could not queue screenshot compression for {instance.id}: {e}")
+
+    transaction.on_commit(enqueue)
+
+
+@receiver([post_save, post_delete], sender=CreditPackage)
+def credit_package_changed(sender, instance, **kwargs):
+    """Drop the cached checkout item for this package"""
+    from .views import checkout_item_cache_key
+
+    cache.delete(checkout_item_cache_key('credit', instance.id))
+
+
+@receiver([post_save, post_delete], sender='accounts.SubscriptionPlan')
+def subscription_plan_changed(sender, instance, **kwargs):
+    """Drop the cached checkout item for this plan"""
+    from .views import checkout_item_cache_key
+
+    cache.delete(checkout_item_cache_key('subscription', instance.id))
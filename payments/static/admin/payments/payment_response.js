@@ -0,0 +1,28 @@
+// Fetch a payment's gateway response only when its "View Response" button is clicked
+function openPaymentResponse(button) {
+    fetch(button.dataset.url, {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+            var w = window.open('', 'Payment Response', 'width=800,height=600,scrollbars=yes');
+            var doc = w.document;
+            var method = (data.payment_method || '').toUpperCase();
+            doc.open();
+            doc.write('<html><head><title></title><style>body{font-family:monospace;padding:20px;background:#1e1e1e;color:#d4d4d4;}pre{white-space:pre-wrap;word-wrap:break-word;}</style></head><body></body></html>');
+            doc.close();
+            doc.title = method + ' Response';
+
+            function add(tag, text, color) {
+                var el = doc.createElement(tag);
+                el.textContent = text;
+                if (color) { el.style.color = color; }
+                doc.body.appendChild(el);
+            }
+            add('h2', method + ' Payment Response', '#4fc3f7');
+            add('p', 'Transaction ID: ' + (data.transaction_id || 'N/A'));
+            add('p', 'Amount: $' + data.amount);
+            add('p', 'Status: ' + data.status);
+            doc.body.appendChild(doc.createElement('hr'));
+            add('h3', 'Gateway Response:', '#81c784');
+            add('pre', JSON.stringify(data.gateway_response, null, 2));
+        });
+}
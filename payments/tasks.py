@@ -0,0 +1,318 @@
+"""
+Background tasks for payments
+"""
+import os
+import logging
+from celery import shared_task
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from voice_cloning.compression_utils import compress_image
+
+logger = logging.getLogger(__name__)
+
+# A paid Checkout session never changes, so its status can be reused for this long
+STRIPE_SESSION_CACHE_TIMEOUT = 60 * 60
+
+
+@shared_task
+def compress_payment_screenshot(request_id):
+    """Compress a manual payment screenshot after the request has been saved"""
+    from .models import ManualPaymentRequest
+
+    payment_request = ManualPaymentRequest.objects.filter(id=request_id).first()
+    if not payment_request or not payment_request.payment_screenshot:
+        return
+
+    screenshot = payment_request.payment_screenshot
+    original_name = screenshot.name
+    with screenshot.open('rb'):
+        compressed = compress_image(screenshot, quality=90, max_width=1920, max_height=1080)
+    if compressed is screenshot:
+        # Compression failed, keep the original upload
+        return
+
+    # upload_to is applied again on save, so only pass the base name
+    screenshot.save(os.path.basename(compressed.name), compressed, save=False)
+    ManualPaymentRequest.objects.filter(id=request_id).update(payment_screenshot=screenshot.name)
+    screenshot.storage.delete(original_name)
+    logger.info(f"Compressed payment screenshot for request {request_id}: {screenshot.name}")
+
+
+@shared_task(bind=True, max_retries=5, retry_backoff=True)
+def process_stripe_webhook(self, webhook_id):
+    """Apply a stored Stripe webhook event"""
+    from .models import PaymentWebhook
+
+    webhook = PaymentWebhook.objects.filter(id=webhook_id, processed=False).first()
+    if not webhook:
+        return
+
+    handler = STRIPE_EVENT_HANDLERS.get(webhook.event_type)
+    try:
+        if handler:
+            handler(webhook.payload['data']['object'])
+    except Exception as e:
+        PaymentWebhook.objects.filter(id=webhook_id).update(error_message=str(e))
+        raise self.retry(exc=e)
+
+    PaymentWebhook.objects.filter(id=webhook_id).update(
+        processed=True,
+        processed_at=timezone.now(),
+        error_message=''
+    )
+
+
+def _handle_successful_payment(payment_intent):
+    """Process successful payment"""
+    from accounts.models import CreditTransaction
+    from .models import Payment
+
+    with transaction.atomic():
+        # Row lock so a retried or duplicated event cannot award credits twice
+        payment = Payment.objects.select_for_update().filter(
+            transaction_id=payment_intent['id'],
+            status='pending'
+        ).select_related('user').first()
+        if not payment:
+            return
+
+        # Update payment status
+        payment.status = 'completed'
+        payment.completed_at = timezone.now()
+        payment.save(update_fields=['status', 'completed_at'])
+
+        # Award credits
+        user = payment.user
+        user.add_credits(payment.credits_awarded)
+
+        # Create credit transaction
+        CreditTransaction.objects.create(
+            user=user,
+            amount=payment.credits_awarded,
+            transaction_type='purchase',
+            description=f"Credit purchase via {payment.payment_method}",
+            balance_after=user.credits
+        )
+
+
+# Stripe event type -> handler for the event's data.object
+STRIPE_EVENT_HANDLERS = {
+    'payment_intent.succeeded': _handle_successful_payment,
+}
+
+
+def _lock_pending_payment(payment_id):
+    """
+    Pending payment row locked until the surrounding transaction ends
+
+    None once another worker or request has already completed (or failed) it.
+    """
+    from .models import Payment
+
+    return Payment.objects.select_for_update().filter(
+        id=payment_id,
+        status='pending'
+    ).select_related('user').first()
+
+
+def award_credits(user, amount, description, idempotency_key):
+    """
+    Add purchased credits and record the CreditTransaction, at most once per key
+
+    Returns False (and changes nothing) if the key was already used.
+    """
+    from accounts.models import CreditTransaction
+
+    try:
+        with transaction.atomic():
+            user.add_credits(amount)
+            CreditTransaction.objects.create(
+                user=user,
+                amount=amount,
+                transaction_type='purchase',
+                description=description,
+                balance_after=user.credits,
+                idempotency_key=idempotency_key
+            )
+    except IntegrityError:
+        user.refresh_from_db(fields=['credits'])
+        return False
+    return True
+
+
+def _retry_or_fail(task, payment_id, exc, error_message):
+    """
+    Retry a finalize task after a transient gateway error
+
+    Once its retries are used up the payment is marked failed instead, so it
+    does not stay pending (and the success page spinning) forever.
+    """
+    from .models import Payment
+
+    if task.request.retries < task.max_retries:
+        raise task.retry(exc=exc, countdown=5 * 2 ** task.request.retries)
+    logger.error(f"Giving up on payment {payment_id} after {task.request.retries} retries: {exc}")
+    Payment.objects.filter(id=payment_id, status='pending').update(status='failed', error_message=error_message)
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def finalize_stripe_checkout(self, payment_id, session_id):
+    """Complete a pending Stripe Checkout payment once its session is paid"""
+    import stripe
+    from accounts.models import Notification
+    from .models import Payment
+    from .payment_gateways import get_payment_gateway
+
+    payment = Payment.objects.filter(id=payment_id, status='pending').select_related('user').first()
+    if not payment:
+        return
+
+    session_key = f"stripe_session:{session_id}"
+    payment_status = cache.get(session_key)
+    if payment_status is None:
+        try:
+            # Sessions are created with the gateway's key, so read them back with it
+            session = stripe.checkout.Session.retrieve(session_id, api_key=get_payment_gateway('stripe').api_key)
+        except Exception as e:
+            _retry_or_fail(self, payment_id, e, f"Could not verify Stripe checkout session: {e}")
+            return
+        payment_status = session.payment_status
+        if payment_status == 'paid':
+            cache.set(session_key, payment_status, timeout=STRIPE_SESSION_CACHE_TIMEOUT)
+        elif session.status == 'expired':
+            # The customer never paid and the session can no longer be completed
+            Payment.objects.filter(id=payment_id, status='pending').update(
+                status='failed',
+                error_message='Stripe checkout session expired'
+            )
+            return
+
+    # Check if payment was successful; unpaid open or asynchronously paid
+    # sessions stay pending and are picked up again on the next success page visit
+    if payment_status != 'paid':
+        return
+
+    with transaction.atomic():
+        payment = _lock_pending_payment(payment_id)
+        if not payment:
+            return
+
+        # Update payment status
+        payment.status = 'completed'
+        payment.completed_at = timezone.now()
+        payment.save(update_fields=['status', 'completed_at'])
+
+        # Award credits; the idempotency key turns a repeated award into a no-op
+        user = payment.user
+        awarded = payment.credits_awarded > 0 and award_credits(
+            user,
+            payment.credits_awarded,
+            description="Credit purchase via stripe",
+            idempotency_key=f"stripe:{session_id}"
+        )
+
+        if awarded:
+            # Send notification in the same transaction as the award
+            Notification.create_notification(
+                user=user,
+                title='Payment Successful!',
+                message=f'{payment.credits_awarded:,} credits have been added to your account.',
+                notification_type='success',
+                link='/dashboard'
+            )
+
+
+def _minimal_paypal_response(order_id, payer_id, capture_result):
+    """Keep only the PayPal fields needed to reconcile a payment"""
+    return {
+        'order_id': order_id,
+        'status': capture_result.get('status'),
+        'payer_id': payer_id,
+        'capture_id': capture_result.get('capture_id'),
+        'amount': capture_result.get('amount'),
+        'currency': capture_result.get('currency'),
+        'create_time': capture_result.get('create_time'),
+    }
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def finalize_paypal_order(self, payment_id, order_id, payer_id):
+    """Capture an approved PayPal order and award its credits"""
+    from accounts.models import Notification
+    from .models import Payment
+    from .payment_gateways import get_payment_gateway
+
+    payment = Payment.objects.filter(id=payment_id, status='pending').select_related('user').first()
+    if not payment:
+        return
+
+    # Capture the payment
+    gateway = get_payment_gateway('paypal')
+
+    try:
+        result = gateway.capture_order(order_id)
+        logger.info(f"PayPal capture result: {result}")
+    except Exception as e:
+        # The capture may still have gone through; check the order before retrying
+        logger.warning(f"PayPal capture error: {e}. Checking order status...")
+        try:
+            order_details = gateway.get_order(order_id)
+        except Exception as check_error:
+            logger.error(f"Error checking order status: {check_error}")
+            _retry_or_fail(self, payment_id, e, str(e))
+            return
+        logger.info(f"PayPal order details: {order_details}")
+        if order_details.get('status') != 'COMPLETED':
+            _retry_or_fail(self, payment_id, e, str(e))
+            return
+        result = {
+            'success': True,
+            'status': 'COMPLETED',
+            'amount': order_details.get('amount'),
+            'currency': order_details.get('currency'),
+        }
+
+    if result.get('success') and result.get('status') == 'COMPLETED':
+        # The capture response already carries everything worth storing
+        gateway_response = _minimal_paypal_response(order_id, payer_id, result)
+
+        with transaction.atomic():
+            payment = _lock_pending_payment(payment_id)
+            if not payment:
+                return
+
+            # Update payment status
+            payment.status = 'completed'
+            payment.completed_at = timezone.now()
+            payment.gateway_response = gateway_response
+            payment.save(update_fields=['status', 'completed_at', 'gateway_response'])
+            logger.info(f"PayPal payment marked completed: {order_id}")
+
+            # Award credits
+            user = payment.user
+            old_balance = user.credits
+            if not award_credits(
+                user,
+                payment.credits_awarded,
+                description=f"Credit purchase via PayPal - ${payment.amount}",
+                idempotency_key=f"paypal:{order_id}"
+            ):
+                logger.info(f"PayPal order {order_id} was already credited")
+                return
+
+            # Send notification in the same transaction as the award
+            Notification.create_notification(
+                user=user,
+                title='Payment Successful!',
+                message=f'{payment.credits_awarded:,} credits have been added to your account via PayPal.',
+                notification_type='success',
+                link='/dashboard'
+            )
+        logger.info(f"Credits awarded: {payment.credits_awarded} to user {user.email}. Old balance: {old_balance}, New balance: {user.credits}")
+    else:
+        logger.error(f"PayPal payment not completed. Result: {result}")
+        Payment.objects.filter(id=payment_id, status='pending').update(
+            status='failed',
+            error_message=f"PayPal status: {result.get('status', 'UNKNOWN')}"
+        )
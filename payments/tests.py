@@ -0,0 +1,200 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+
+from accounts.models import CreditTransaction, Notification
+from .models import Payment, PaymentWebhook
+from .payment_gateways import PaymentGatewayError
+from .tasks import (
+    STRIPE_EVENT_HANDLERS,
+    award_credits,
+    finalize_paypal_order,
+    finalize_stripe_checkout,
+    process_stripe_webhook,
+)
+
+User = get_user_model()
+
+
+class AwardCreditsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass')
+        self.starting_credits = self.user.credits
+
+    def test_key_is_awarded_once(self):
+        self.assertTrue(award_credits(self.user, 500, 'Credit purchase', idempotency_key='test:1'))
+        self.assertFalse(award_credits(self.user, 500, 'Credit purchase', idempotency_key='test:1'))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, self.starting_credits + 500)
+        self.assertEqual(CreditTransaction.objects.filter(idempotency_key='test:1').count(), 1)
+
+    def test_distinct_keys_are_both_awarded(self):
+        award_credits(self.user, 500, 'Credit purchase', idempotency_key='test:1')
+        award_credits(self.user, 250, 'Credit purchase', idempotency_key='test:2')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.credits, self.starting_credits + 750)
+
+
+class FinalizeTaskTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass')
+        self.starting_credits = self.user.credits
+
+    def _pending_payment(self, payment_method, transaction_id):
+        return Payment.objects.create(
+            user=self.user,
+            amount='10.00',
+            payment_method=payment_method,
+            payment_type='credit',
+            status='pending',
+            transaction_id=transaction_id,
+            credits_awarded=1000,
+        )
+
+    def _assert_awarded_once(self, payment):
+        payment.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(payment.status, 'completed')
+        self.assertEqual(self.user.credits, self.starting_credits + 1000)
+        self.assertEqual(CreditTransaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Notification.objects.filter(user=self.user, title='Payment Successful!').count(), 1)
+
+    @mock.patch('payments.payment_gateways.get_payment_gateway')
+    @mock.patch('stripe.checkout.Session.retrieve')
+    def test_stripe_checkout_awards_once(self, retrieve, get_gateway):
+        get_gateway.return_value = SimpleNamespace(api_key='sk_test')
+        retrieve.return_value = SimpleNamespace(payment_status='paid', status='complete')
+        payment = self._pending_payment('stripe', 'cs_test_1')
+
+        finalize_stripe_checkout(str(payment.id), 'cs_test_1')
+        finalize_stripe_checkout(str(payment.id), 'cs_test_1')
+        # Even a payment put back to pending cannot be credited twice for the session
+        Payment.objects.filter(id=payment.id).update(status='pending')
+        finalize_stripe_checkout(str(payment.id), 'cs_test_1')
+
+        self._assert_awarded_once(payment)
+        retrieve.assert_called_once()
+
+    @mock.patch('payments.payment_gateways.get_payment_gateway')
+    @mock.patch('stripe.checkout.Session.retrieve')
+    def test_expired_stripe_session_fails_payment(self, retrieve, get_gateway):
+        get_gateway.return_value = SimpleNamespace(api_key='sk_test')
+        retrieve.return_value = SimpleNamespace(payment_status='unpaid', status='expired')
+        payment = self._pending_payment('stripe', 'cs_test_2')
+
+        finalize_stripe_checkout(str(payment.id), 'cs_test_2')
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'failed')
+
+    @mock.patch('payments.payment_gateways.get_payment_gateway')
+    def test_paypal_order_awards_once(self, get_gateway):
+        gateway = get_gateway.return_value
+        gateway.capture_order.return_value = {
+            'success': True, 'order_id': 'ORDER1', 'status': 'COMPLETED', 'capture_id': 'CAP1',
+            'amount': '10.00', 'currency': 'USD', 'create_time': None,
+        }
+        payment = self._pending_payment('paypal', 'ORDER1')
+
+        finalize_paypal_order(str(payment.id), 'ORDER1', 'PAYER1')
+        finalize_paypal_order(str(payment.id), 'ORDER1', 'PAYER1')
+
+        self._assert_awarded_once(payment)
+        gateway.capture_order.assert_called_once_with('ORDER1')
+        payment.refresh_from_db()
+        self.assertEqual(payment.gateway_response['capture_id'], 'CAP1')
+
+    @mock.patch('payments.payment_gateways.get_payment_gateway')
+    def test_paypal_transient_error_keeps_payment_pending(self, get_gateway):
+        gateway = get_gateway.return_value
+        gateway.capture_order.side_effect = PaymentGatewayError('PayPal capture error: timeout')
+        gateway.get_order.side_effect = PaymentGatewayError('PayPal get order error: timeout')
+        payment = self._pending_payment('paypal', 'ORDER2')
+
+        # Called directly, a retry re-raises the error instead of re-queueing
+        with self.assertRaises(PaymentGatewayError):
+            finalize_paypal_order(str(payment.id), 'ORDER2', 'PAYER1')
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+
+
+class BrokerDownTests(TestCase):
+    """With the broker unreachable, tasks run inline without breaking the request"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass')
+        self.client.force_login(self.user)
+
+    @mock.patch.object(finalize_paypal_order, 'delay', side_effect=OSError('broker down'))
+    @mock.patch('payments.payment_gateways.get_payment_gateway')
+    def test_paypal_return_records_failure_and_redirects_to_success(self, get_gateway, delay):
+        gateway = get_gateway.return_value
+        gateway.capture_order.side_effect = PaymentGatewayError('PayPal capture error: timeout')
+        gateway.get_order.side_effect = PaymentGatewayError('PayPal get order error: timeout')
+        payment = Payment.objects.create(
+            user=self.user,
+            amount='10.00',
+            payment_method='paypal',
+            payment_type='credit',
+            status='pending',
+            transaction_id='ORDER3',
+            credits_awarded=1000,
+        )
+
+        response = self.client.get('/api/payments/paypal/return/', {'token': 'ORDER3', 'PayerID': 'PAYER1'})
+
+        self.assertEqual(response.status_code, 303)
+        self.assertEqual(response['Location'], f'/api/payments/success/?payment_id={payment.id}')
+        # The inline run used up its retries in-process, then gave up on the payment
+        self.assertEqual(gateway.capture_order.call_count, finalize_paypal_order.max_retries + 1)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'failed')
+        self.assertIn('timeout', payment.error_message)
+
+
+class WebhookBrokerDownTests(TransactionTestCase):
+    """Outside a test transaction, so the webhook's on_commit enqueue runs inside the request"""
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch.object(process_stripe_webhook, 'delay', side_effect=OSError('broker down'))
+    @mock.patch('payments.views.get_payment_gateway')
+    def test_failed_webhook_is_processed_on_redelivery(self, get_gateway, delay):
+        event = {'id': 'evt_1', 'type': 'payment_intent.succeeded', 'data': {'object': {'id': 'pi_1'}}}
+        get_gateway.return_value.verify_webhook.return_value = {'event': event}
+
+        def deliver():
+            return self.client.post(
+                '/api/payments/webhooks/stripe/', data=b'{}', content_type='application/json',
+                HTTP_STRIPE_SIGNATURE='sig'
+            )
+
+        failing_handler = mock.Mock(side_effect=RuntimeError('database unavailable'))
+        with mock.patch.dict(STRIPE_EVENT_HANDLERS, {'payment_intent.succeeded': failing_handler}):
+            response = deliver()
+
+        self.assertEqual(response.status_code, 503)
+        webhook = PaymentWebhook.objects.get(event_id='evt_1')
+        self.assertFalse(webhook.processed)
+
+        # Stripe redelivers; the stored row is queued again instead of reported as a duplicate
+        handler = mock.Mock()
+        with mock.patch.dict(STRIPE_EVENT_HANDLERS, {'payment_intent.succeeded': handler}):
+            response = deliver()
+
+        self.assertEqual(response.status_code, 200)
+        handler.assert_called_once_with({'id': 'pi_1'})
+        webhook.refresh_from_db()
+        self.assertTrue(webhook.processed)
+        self.assertEqual(PaymentWebhook.objects.filter(event_id='evt_1').count(), 1)
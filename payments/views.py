@@ -1,16 +1,21 @@
 from rest_framework import viewsets, status, views
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Now
 from django.utils import timezone
+from django.http import HttpResponseSeeOther
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from datetime import timedelta
+import logging
 import uuid
 import stripe
-import hashlib
-import hmac
 
 from .models import Payment, CreditPackage, Subscription, PaymentWebhook
 from .serializers import (
@@ -19,16 +24,71 @@ from .serializers import (
     SubscriptionSerializer,
     CreatePaymentSerializer
 )
-from accounts.models import User, CreditTransaction, SubscriptionPlan, PlatformSettings
+from .payment_gateways import get_payment_gateway, PaymentGatewayError, to_minor_units, usd_to_pkr
+from .tasks import (
+    STRIPE_EVENT_HANDLERS,
+    award_credits,
+    finalize_paypal_order,
+    finalize_stripe_checkout,
+    process_stripe_webhook,
+)
+from accounts.models import User, CreditTransaction, SubscriptionPlan, ActivityLog
+
+logger = logging.getLogger(__name__)
+
+# How long a confirmed (or in-flight) Stripe intent blocks repeat confirm calls
+STRIPE_CONFIRM_DEDUPE_TIMEOUT = 60 * 10
+
+# How long a queued Checkout finalization suppresses re-queueing on page reloads
+STRIPE_CHECKOUT_DEDUPE_TIMEOUT = 60
+
+
+def _stripe_secret_key():
+    """
+    Stripe secret key from PlatformSettings, falling back to settings.py
+
+    Read from the shared StripeGateway, which resolves it once per settings version,
+    and passed per call instead of assigning the module-global stripe.api_key.
+    """
+    return get_payment_gateway('stripe').api_key
+
+
+def _run_task(task, *args):
+    """
+    Queue a Celery task, running it inline if the broker is unreachable
+
+    The inline run goes through apply(), so the task's own retries (and its
+    give-up handling) happen in-process and nothing is raised into the request.
+    Returns False if the inline run still failed.
+    """
+    try:
+        task.delay(*args)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not queue {task.name}, running inline: {e}")
+
+    result = task.apply(args=args)
+    if result.failed():
+        logger.error(f"Inline {task.name} failed: {result.result}")
+        return False
+    return True
+
 
+def _redirect_to_success(payment):
+    """
+    303 to the read-only success page for a payment
 
-# Configure Stripe - will be set dynamically from PlatformSettings
-# Fallback to settings.py if not configured in database
-try:
-    platform_settings = PlatformSettings.get_settings()
-    stripe.api_key = platform_settings.stripe_secret_key if platform_settings.stripe_secret_key else getattr(settings, 'STRIPE_SECRET_KEY', '')
-except:
-    stripe.api_key = getattr(settings, 'STRIPE_SECRET_KEY', '')
+    Refreshing or going back to the success page then re-renders it
+    instead of re-entering the gateway return handler.
+    """
+    return HttpResponseSeeOther(f"{reverse('payments:payment-success')}?payment_id={payment.id}")
+
+
+def _package_and_plan(package_id, plan_id):
+    """CreditPackage and SubscriptionPlan for the given ids, None for missing ones"""
+    package = CreditPackage.objects.in_bulk([package_id]).get(int(package_id)) if package_id else None
+    plan = SubscriptionPlan.objects.in_bulk([plan_id]).get(int(plan_id)) if plan_id else None
+    return package, plan
 
 
 class CreditPackageViewSet(viewsets.ModelViewSet):
@@ -54,8 +114,17 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
 
+    # payment_method -> handler creating the gateway payment (CreatePaymentSerializer limits the keys)
+    PAYMENT_HANDLERS = {
+        'stripe': '_create_stripe_payment',
+        'paypal': '_create_paypal_payment',
+        'jazzcash': '_create_pakistani_payment',
+        'easypaisa': '_create_pakistani_payment',
+    }
+
     def get_queryset(self):
-        return Payment.objects.filter(user=self.request.user)
+        # PaymentSerializer reads no relations (user_email is a column); skip the gateway JSON blob
+        return Payment.objects.filter(user=self.request.user).defer('gateway_response')
 
     @action(detail=False, methods=['post'])
     def create_payment(self, request):
@@ -68,7 +137,7 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
         payment_type = serializer.validated_data['payment_type']
 
         # Check if payment method is enabled in platform settings
-        enabled_gateways = PlatformSettings.get_enabled_gateways()
+        enabled_gateways = request.platform_settings.enabled_gateways
         if payment_method not in enabled_gateways:
             return Response({
                 'error': f'{payment_method.capitalize()} payment gateway is not enabled. Please select another payment method.'
@@ -82,41 +151,26 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
 
         if payment_type == 'credit':
             package_id = serializer.validated_data['package_id']
-            package = CreditPackage.objects.get(id=package_id, is_active=True)
+            # Only the columns used below (price, credits, and id for Stripe metadata)
+            package = CreditPackage.objects.only('id', 'price', 'credits').get(id=package_id, is_active=True)
             amount = package.price
             credits_to_award = package.credits
 
         elif payment_type == 'subscription':
             plan_id = serializer.validated_data['plan_id']
-            plan = SubscriptionPlan.objects.get(id=plan_id, is_active=True)
+            plan = SubscriptionPlan.objects.only('id', 'price', 'credits_per_month').get(id=plan_id, is_active=True)
             amount = plan.price
             credits_to_award = plan.credits_per_month
 
         # Create payment intent based on payment method
-        if payment_method == 'stripe':
-            return self._create_stripe_payment(
-                user, amount, payment_type, credits_to_award, package, plan
-            )
-        elif payment_method == 'paypal':
-            return self._create_paypal_payment(
-                user, amount, payment_type, credits_to_award
-            )
-        elif payment_method in ['jazzcash', 'easypaisa']:
-            return self._create_pakistani_payment(
-                user, amount, payment_method, payment_type, credits_to_award
-            )
-
-        return Response({
-            'error': 'Unsupported payment method'
-        }, status=status.HTTP_400_BAD_REQUEST)
+        handler = getattr(self, self.PAYMENT_HANDLERS[payment_method])
+        return handler(
+            user, amount, payment_method, payment_type, credits_to_award, package, plan
+        )
 
-    def _create_stripe_payment(self, user, amount, payment_type, credits, package=None, plan=None):
+    def _create_stripe_payment(self, user, amount, payment_method, payment_type, credits, package=None, plan=None):
         """Create Stripe payment intent - Payment record will be created only after successful payment"""
         try:
-            # Get fresh Stripe key from Platform Settings
-            platform_settings = PlatformSettings.get_settings()
-            stripe.api_key = platform_settings.stripe_secret_key if platform_settings.stripe_secret_key else getattr(settings, 'STRIPE_SECRET_KEY', '')
-
             # Prepare metadata - store all info needed to create payment record later
             metadata = {
                 'user_id': str(user.id),
@@ -130,7 +184,8 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                 metadata['package_id'] = str(package.id)
 
             intent = stripe.PaymentIntent.create(
-                amount=int(amount * 100),  # Convert to cents
+                api_key=_stripe_secret_key(),
+                amount=to_minor_units(amount),  # Convert to cents
                 currency='usd',
                 metadata=metadata
             )
@@ -177,28 +232,32 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                     'payment_id': existing.id
                 })
 
-            # Get Stripe API key and retrieve intent for metadata
-            platform_settings = PlatformSettings.get_settings()
-            stripe.api_key = platform_settings.stripe_secret_key if platform_settings.stripe_secret_key else getattr(settings, 'STRIPE_SECRET_KEY', '')
-
-            try:
-                intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-                metadata = intent.metadata
-                user_id = metadata.get('user_id')
-                payment_type = metadata.get('payment_type', 'credit')
-                credits = int(metadata.get('credits', 0))
-                amount = float(metadata.get('amount', 0))
-                package_id = metadata.get('package_id')
-                plan_id = metadata.get('plan_id')
-            except Exception:
-                # If can't retrieve from Stripe, use request data
-                metadata = {}
-                user_id = str(request.user.id)
-                payment_type = request.data.get('payment_type', 'credit')
-                credits = int(request.data.get('credits', 0))
-                amount = float(request.data.get('amount', 0))
-                package_id = request.data.get('package_id')
-                plan_id = request.data.get('plan_id')
+            package_id = request.data.get('package_id')
+            plan_id = request.data.get('plan_id')
+            if package_id or plan_id:
+                # The checkout page sends what it paid for; price it from the package/plan
+                # below instead of a Stripe round trip for the intent's metadata
+                user_id = None
+                payment_type = 'subscription' if plan_id else 'credit'
+                amount = None
+            else:
+                try:
+                    # Retrieve intent for metadata
+                    intent = stripe.PaymentIntent.retrieve(payment_intent_id, api_key=_stripe_secret_key())
+                    metadata = intent.metadata
+                    user_id = metadata.get('user_id')
+                    payment_type = metadata.get('payment_type', 'credit')
+                    credits = int(metadata.get('credits', 0))
+                    amount = float(metadata.get('amount', 0))
+                    package_id = metadata.get('package_id')
+                    plan_id = metadata.get('plan_id')
+                except Exception:
+                    # If can't retrieve from Stripe, use request data
+                    metadata = {}
+                    user_id = str(request.user.id)
+                    payment_type = request.data.get('payment_type', 'credit')
+                    credits = int(request.data.get('credits', 0))
+                    amount = float(request.data.get('amount', 0))
 
             # Verify user
             user = request.user
@@ -209,18 +268,10 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                 }, status=status.HTTP_403_FORBIDDEN)
 
             # Get package or plan if applicable
-            package = None
-            plan = None
-            if package_id:
-                try:
-                    package = CreditPackage.objects.get(id=package_id)
-                except CreditPackage.DoesNotExist:
-                    pass
-            if plan_id:
-                try:
-                    plan = SubscriptionPlan.objects.get(id=plan_id)
-                except SubscriptionPlan.DoesNotExist:
-                    pass
+            package, plan = _package_and_plan(package_id, plan_id)
+            if amount is None:
+                item = plan or package
+                amount = item.price if item else float(request.data.get('amount', 0))
 
             # Create failed payment record
             payment = Payment.objects.create(
@@ -269,14 +320,38 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': 'Payment Intent ID required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            # Get Stripe API key
-            platform_settings = PlatformSettings.get_settings()
-            stripe.api_key = platform_settings.stripe_secret_key if platform_settings.stripe_secret_key else getattr(settings, 'STRIPE_SECRET_KEY', '')
+        # Double clicks and client retries: skip the Stripe round trip while this intent
+        # is being (or has just been) confirmed
+        confirm_key = f"stripe_confirm:{payment_intent_id}"
+        if not cache.add(confirm_key, 1, timeout=STRIPE_CONFIRM_DEDUPE_TIMEOUT):
+            existing_payment = Payment.objects.filter(
+                transaction_id=payment_intent_id, status='completed'
+            ).select_related('user').first()
+            if existing_payment:
+                return Response({
+                    'success': True,
+                    'message': 'Payment already confirmed',
+                    'credits_awarded': existing_payment.credits_awarded,
+                    'new_balance': existing_payment.user.credits,
+                    'payment_id': existing_payment.id
+                })
+            return Response({
+                'success': False,
+                'error': 'Payment confirmation already in progress'
+            }, status=status.HTTP_409_CONFLICT)
 
+        response = self._confirm_stripe_intent(request, payment_intent_id)
+        if not response.data.get('success'):
+            # Let the client retry a confirmation that did not go through
+            cache.delete(confirm_key)
+        return response
+
+    def _confirm_stripe_intent(self, request, payment_intent_id):
+        """Verify the intent with Stripe, then record the payment and award credits"""
+        try:
             # Verify payment with Stripe
             try:
-                intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+                intent = stripe.PaymentIntent.retrieve(payment_intent_id, api_key=_stripe_secret_key())
             except Exception as e:
                 return Response({
                     'success': False,
@@ -320,118 +395,116 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                 }, status=status.HTTP_403_FORBIDDEN)
 
             # Get package or plan if applicable
-            package = None
-            plan = None
-            if package_id:
-                try:
-                    package = CreditPackage.objects.get(id=package_id)
-                except CreditPackage.DoesNotExist:
-                    pass
-            if plan_id:
-                try:
-                    plan = SubscriptionPlan.objects.get(id=plan_id)
-                except SubscriptionPlan.DoesNotExist:
-                    pass
+            package, plan = _package_and_plan(package_id, plan_id)
 
             # NOW create the payment record (only after successful payment)
-            # Store full Stripe response for debugging/tracking
+            # Keep only what support looks up; the full intent arrives with the
+            # payment_intent.succeeded webhook and is stored on PaymentWebhook
+            charges = intent.charges.data if hasattr(intent, 'charges') and intent.charges else []
+            charge = charges[0] if charges else None
             gateway_response = {
                 'payment_intent_id': intent.id,
                 'status': intent.status,
-                'amount': intent.amount,
                 'amount_received': intent.amount_received,
                 'currency': intent.currency,
                 'payment_method': intent.payment_method,
-                'payment_method_types': intent.payment_method_types,
-                'created': intent.created,
-                'metadata': dict(intent.metadata) if intent.metadata else {},
-                'charges': {
-                    'total_count': intent.charges.total_count if hasattr(intent, 'charges') and intent.charges else 0,
-                    'data': [
-                        {
-                            'id': charge.id,
-                            'amount': charge.amount,
-                            'status': charge.status,
-                            'paid': charge.paid,
-                            'receipt_url': charge.receipt_url,
-                            'payment_method_details': dict(charge.payment_method_details) if charge.payment_method_details else {},
-                            'billing_details': dict(charge.billing_details) if charge.billing_details else {},
-                        }
-                        for charge in (intent.charges.data if hasattr(intent, 'charges') and intent.charges else [])
-                    ]
-                },
-                'client_secret': intent.client_secret[:20] + '...' if intent.client_secret else None,  # Partial for security
+                'charge_id': charge.id if charge else None,
+                'receipt_url': charge.receipt_url if charge else None,
                 'livemode': intent.livemode,
             }
 
-            payment = Payment.objects.create(
-                user=user,
-                amount=amount,
-                currency='USD',
-                payment_method='stripe',
-                payment_type=payment_type,
-                status='completed',  # Directly set as completed
-                transaction_id=payment_intent_id,
-                credits_awarded=credits,
-                package=package,
-                plan=plan,
-                completed_at=timezone.now(),
-                gateway_response=gateway_response  # Store full response
-            )
+            payment_values = {
+                'user': user,
+                'amount': amount,
+                'currency': 'USD',
+                'payment_method': 'stripe',
+                'payment_type': payment_type,
+                'status': 'completed',  # Directly set as completed
+                'credits_awarded': credits,
+                'package': package,
+                'plan': plan,
+                'completed_at': timezone.now(),
+                'gateway_response': gateway_response
+            }
 
-            # Handle Subscription Plan Upgrade
-            if payment_type == 'subscription' and plan:
-                # Update user's subscription plan
-                user.subscription_plan = plan
-                user.subscription_type = plan.plan_type
-                user.subscription_start = timezone.now()
-
-                # Set subscription end date based on plan type
-                if plan.plan_type == 'yearly':
-                    user.subscription_end = timezone.now() + timedelta(days=365)
-                elif plan.plan_type == 'free':
-                    user.subscription_end = timezone.now() + timedelta(days=365 * 100)
-                else:
-                    user.subscription_end = timezone.now() + timedelta(days=30)
-
-                user.save()
-
-                # Create or update Subscription record
-                subscription_id = f"SUB_STRIPE_{user.id}_{uuid.uuid4().hex[:8]}"
-                existing_subscription = Subscription.objects.filter(user=user).first()
-
-                if existing_subscription:
-                    existing_subscription.plan = plan
-                    existing_subscription.status = 'active'
-                    existing_subscription.start_date = timezone.now()
-                    existing_subscription.end_date = user.subscription_end
-                    existing_subscription.payment_method = 'stripe'
-                    existing_subscription.auto_renew = False
-                    existing_subscription.save()
-                else:
-                    Subscription.objects.create(
-                        user=user,
+            # transaction_id is unique: a concurrent confirm (double click, retry) waits on the
+            # row lock here and then sees the completed payment instead of awarding twice
+            with transaction.atomic():
+                payment, created = Payment.objects.select_for_update().get_or_create(
+                    transaction_id=payment_intent_id,
+                    defaults=payment_values
+                )
+                if not created:
+                    if payment.status == 'completed':
+                        return Response({
+                            'success': True,
+                            'message': 'Payment already confirmed',
+                            'credits_awarded': payment.credits_awarded,
+                            'new_balance': payment.user.credits,
+                            'payment_id': payment.id
+                        })
+                    # An earlier failed attempt on this intent has now succeeded
+                    for field, value in payment_values.items():
+                        setattr(payment, field, value)
+                    payment.save(update_fields=[*payment_values, 'user_email'])
+
+                # User columns to write, applied together with the credit award below
+                user_updates = {'credits': F('credits') + credits}
+
+                # Handle Subscription Plan Upgrade
+                if payment_type == 'subscription' and plan:
+                    # Set subscription end date based on plan type, computed by the database
+                    if plan.plan_type == 'yearly':
+                        subscription_end = Now() + timedelta(days=365)
+                    elif plan.plan_type == 'free':
+                        subscription_end = Now() + timedelta(days=365 * 100)
+                    else:
+                        subscription_end = Now() + timedelta(days=30)
+
+                    # Update user's subscription plan
+                    user_updates['subscription_plan'] = plan
+                    user_updates['subscription_type'] = plan.plan_type
+                    user_updates['subscription_end_date'] = subscription_end
+
+                # Award credits (and the plan change) in a single UPDATE; F() keeps a concurrent
+                # webhook's increment from being lost. The user row lock it takes also
+                # serializes this user's confirmations until commit.
+                User.objects.filter(pk=user.pk).update(**user_updates)
+                user.refresh_from_db(fields=['credits'])
+
+                if payment_type == 'subscription' and plan:
+                    # Update the user's latest subscription, creating it on the first purchase;
+                    # older (cancelled or expired) rows keep their history
+                    latest_subscription = Subscription.objects.filter(user=user).order_by('-created_at').values('id')[:1]
+                    updated = Subscription.objects.filter(id=latest_subscription).update(
                         plan=plan,
                         status='active',
-                        subscription_id=subscription_id,
-                        start_date=timezone.now(),
-                        end_date=user.subscription_end,
+                        start_date=Now(),
+                        end_date=subscription_end,
                         payment_method='stripe',
                         auto_renew=False,
+                        updated_at=Now(),
                     )
-
-            # Award credits
-            user.credits += credits
-            user.save()
-
-            # Create credit transaction record
-            CreditTransaction.objects.create(
-                user=user,
-                amount=credits,
-                transaction_type='purchase',
-                description=f"Credit purchase via Stripe - ${amount}",
-                balance_after=user.credits
-            )
+                    if not updated:
+                        Subscription.objects.create(
+                            user=user,
+                            plan=plan,
+                            status='active',
+                            subscription_id=f"SUB_STRIPE_{user.id}_{uuid.uuid4().hex[:8]}",
+                            start_date=Now(),
+                            end_date=subscription_end,
+                            payment_method='stripe',
+                            auto_renew=False,
+                        )
+
+                # Create credit transaction record
+                CreditTransaction.objects.create(
+                    user=user,
+                    amount=credits,
+                    transaction_type='purchase',
+                    description=f"Credit purchase via Stripe - ${amount}",
+                    balance_after=user.credits
+                )
 
             return Response({
                 'success': True,
@@ -443,20 +516,17 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             })
 
         except Exception as e:
-            import traceback
-            print(f"Error confirming payment: {e}")
-            print(traceback.format_exc())
+            logger.exception("Error confirming payment %s", payment_intent_id)
             return Response({
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _create_paypal_payment(self, user, amount, payment_type, credits):
+    def _create_paypal_payment(self, user, amount, payment_method, payment_type, credits, package=None, plan=None):
         """Create PayPal payment"""
-        from .payment_gateways import PayPalGateway, PaymentGatewayError
 
         try:
-            gateway = PayPalGateway()
+            gateway = get_payment_gateway('paypal')
 
             # Generate return and cancel URLs
             base_url = getattr(settings, 'BASE_URL', 'https://talkstudio.ai')
@@ -499,13 +569,12 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': f'PayPal payment error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _create_pakistani_payment(self, user, amount, payment_method, payment_type, credits):
+    def _create_pakistani_payment(self, user, amount, payment_method, payment_type, credits, package=None, plan=None):
         """Create JazzCash or Easypaisa payment"""
-        from .payment_gateways import JazzCashGateway, EasypaisaGateway, PaymentGatewayError
 
         try:
-            # Convert amount to PKR (assuming 1 USD = 280 PKR approximately)
-            pkr_amount = amount * 280
+            # Convert amount to PKR using the exchange rate from platform settings
+            pkr_amount = usd_to_pkr(amount, self.request.platform_settings.usd_to_pkr_rate)
 
             # Generate return URL
             base_url = getattr(settings, 'BASE_URL', 'https://talkstudio.ai')
@@ -515,7 +584,7 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             mobile_number = self.request.data.get('mobile_number', '')
 
             if payment_method == 'jazzcash':
-                gateway = JazzCashGateway()
+                gateway = get_payment_gateway('jazzcash')
                 result = gateway.create_transaction(
                     amount=pkr_amount,
                     currency='PKR',
@@ -523,7 +592,7 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
                     mobile_number=mobile_number
                 )
             elif payment_method == 'easypaisa':
-                gateway = EasypaisaGateway()
+                gateway = get_payment_gateway('easypaisa')
                 result = gateway.create_transaction(
                     amount=pkr_amount,
                     currency='PKR',
@@ -565,65 +634,71 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# How long processed Stripe event ids are remembered
+STRIPE_EVENT_DEDUPE_TIMEOUT = 60 * 60 * 24
+
+
 class StripeWebhookView(views.APIView):
     """Handle Stripe webhooks"""
     permission_classes = [AllowAny]
+    enqueue_failed = False
 
     def post(self, request):
         payload = request.body
         sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
 
         try:
-            event = stripe.Webhook.construct_event(
-                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
-            )
-        except ValueError:
-            return Response({'error': 'Invalid payload'}, status=400)
+            # Shared gateway instance; the secret was resolved when it was built
+            event = get_payment_gateway('stripe').verify_webhook(payload, sig_header)['event']
+        except PaymentGatewayError as e:
+            return Response({'error': str(e)}, status=400)
         except Exception:
             return Response({'error': 'Invalid signature'}, status=400)
 
-        # Log webhook
-        PaymentWebhook.objects.create(
-            payment_method='stripe',
-            event_type=event['type'],
-            payload=event
-        )
-
-        # Handle payment success
-        if event['type'] == 'payment_intent.succeeded':
-            payment_intent = event['data']['object']
-            self._handle_successful_payment(payment_intent)
+        # Stripe redelivers events; acknowledge ids seen in the last day without touching the DB
+        dedupe_key = f"stripe_evt:{event['id']}"
+        if not cache.add(dedupe_key, 1, timeout=STRIPE_EVENT_DEDUPE_TIMEOUT):
+            return Response({'status': 'duplicate'})
 
-        return Response({'status': 'success'})
+        # Event types nothing handles are only logged, never queued
+        handled = event['type'] in STRIPE_EVENT_HANDLERS
 
-    def _handle_successful_payment(self, payment_intent):
-        """Process successful payment"""
         try:
-            payment = Payment.objects.get(
-                transaction_id=payment_intent['id'],
-                status='pending'
-            )
-
-            # Update payment status
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.save()
+            # Log webhook; a worker applies it so Stripe gets its 200 right away
+            with transaction.atomic():
+                webhook = PaymentWebhook.objects.create(
+                    payment_method='stripe',
+                    event_id=event['id'],
+                    event_type=event['type'],
+                    payload=event,
+                    processed=not handled,
+                    processed_at=None if handled else timezone.now()
+                )
+        except IntegrityError:
+            # Already stored (redelivered after the cache entry expired or on another process);
+            # queue it again if an earlier delivery never got it processed
+            webhook = PaymentWebhook.objects.filter(event_id=event['id'], processed=False).first()
+            if not webhook:
+                return Response({'status': 'duplicate'})
+        except Exception:
+            # Let Stripe's retry through
+            cache.delete(dedupe_key)
+            raise
 
-            # Award credits
-            user = payment.user
-            user.add_credits(payment.credits_awarded)
+        if handled:
+            # Never let a worker look for a row that isn't committed yet
+            transaction.on_commit(lambda: self._enqueue(webhook, dedupe_key))
+            if self.enqueue_failed:
+                # Row stays unprocessed; Stripe's redelivery queues it again
+                return Response({'error': 'Event stored but not processed'}, status=503)
 
-            # Create credit transaction
-            CreditTransaction.objects.create(
-                user=user,
-                amount=payment.credits_awarded,
-                transaction_type='purchase',
-                description=f"Credit purchase via {payment.payment_method}",
-                balance_after=user.credits
-            )
+        return Response({'status': 'success'})
 
-        except Payment.DoesNotExist:
-            pass
+    def _enqueue(self, webhook, dedupe_key):
+        """Queue the stored event, handling it inline if the broker is unreachable"""
+        if not _run_task(process_stripe_webhook, str(webhook.id)):
+            cache.delete(dedupe_key)
+            self.enqueue_failed = True
 
 
 class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -632,7 +707,7 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Subscription.objects.filter(user=self.request.user)
+        return Subscription.objects.filter(user=self.request.user).select_related('user', 'plan')
 
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -653,6 +728,54 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
+# Checkout line items per package/plan; payments/signals.py drops them on save
+CHECKOUT_ITEM_CACHE_TIMEOUT = 60 * 5
+
+
+def checkout_item_cache_key(payment_type, item_id):
+    return f"checkout_item:{payment_type}:{item_id}"
+
+
+def _format_credits(credits):
+    """Format credits in human-readable form"""
+    if credits >= 1000000:
+        return f"{credits // 1000000} Million Credits"
+    if credits >= 1000:
+        return f"{credits // 1000}K Credits"
+    return f"{credits} Credits"
+
+
+def _checkout_item(payment_type, item_id):
+    """Checkout context for an active package/plan (cached), or None if unavailable"""
+    try:
+        item_id = int(item_id)
+    except (TypeError, ValueError):
+        return None
+    if payment_type not in ('credit', 'subscription'):
+        return None
+
+    cache_key = checkout_item_cache_key(payment_type, item_id)
+    item = cache.get(cache_key)
+    if item is None:
+        if payment_type == 'credit':
+            package = CreditPackage.objects.filter(id=item_id, is_active=True).only('name', 'price', 'credits').first()
+            item = {
+                'item_name': package.name,
+                'amount': package.price,
+                'credits': _format_credits(package.credits),
+            } if package else False
+        else:
+            plan = SubscriptionPlan.objects.filter(id=item_id, is_active=True).only('name', 'price', 'credits_per_month').first()
+            item = {
+                'item_name': f"{plan.name} Subscription",
+                'amount': plan.price,
+                'credits': _format_credits(plan.credits_per_month),
+            } if plan else False
+        # False caches "not available" too, so bad links don't hit the DB either
+        cache.set(cache_key, item, CHECKOUT_ITEM_CACHE_TIMEOUT)
+    return item or None
+
+
 @login_required
 def checkout_page(request):
     """Render checkout page for payments"""
@@ -661,8 +784,8 @@ def checkout_page(request):
     plan_id = request.GET.get('plan_id')
 
     # Get platform settings for payment gateways
-    platform_settings = PlatformSettings.get_settings()
-    enabled_gateways = PlatformSettings.get_enabled_gateways()
+    platform_settings = request.platform_settings
+    enabled_gateways = platform_settings.enabled_gateways
 
     # If no payment gateways are enabled, redirect to pricing with error
     if not enabled_gateways:
@@ -680,49 +803,11 @@ def checkout_page(request):
     }
 
     # Get package or plan details
-    if payment_type == 'credit' and package_id:
-        try:
-            package = CreditPackage.objects.get(id=package_id, is_active=True)
-
-            # Format credits in human-readable form
-            credits = package.credits
-            if credits >= 1000000:
-                formatted_credits = f"{credits // 1000000} Million Credits"
-            elif credits >= 1000:
-                formatted_credits = f"{credits // 1000}K Credits"
-            else:
-                formatted_credits = f"{credits} Credits"
-
-            context.update({
-                'item_name': package.name,
-                'amount': package.price,
-                'credits': formatted_credits,
-            })
-        except CreditPackage.DoesNotExist:
-            return redirect('pricing')
-
-    elif payment_type == 'subscription' and plan_id:
-        try:
-            plan = SubscriptionPlan.objects.get(id=plan_id, is_active=True)
-
-            # Format credits in human-readable form
-            credits = plan.credits_per_month
-            if credits >= 1000000:
-                formatted_credits = f"{credits // 1000000} Million Credits"
-            elif credits >= 1000:
-                formatted_credits = f"{credits // 1000}K Credits"
-            else:
-                formatted_credits = f"{credits} Credits"
-
-            context.update({
-                'item_name': f"{plan.name} Subscription",
-                'amount': plan.price,
-                'credits': formatted_credits,
-            })
-        except SubscriptionPlan.DoesNotExist:
-            return redirect('pricing')
-    else:
+    item_id = package_id if payment_type == 'credit' else plan_id
+    item = _checkout_item(payment_type, item_id) if item_id else None
+    if item is None:
         return redirect('pricing')
+    context.update(item)
 
     return render(request, 'checkout.html', context)
 
@@ -739,63 +824,18 @@ def payment_success_page(request):
     try:
         payment = Payment.objects.get(id=payment_id, user=request.user)
 
-        # If this is a Stripe payment and still pending, process it now
-        if payment.payment_method == 'stripe' and payment.status == 'pending' and session_id:
+        # Stripe Checkout payments are verified and credited by a worker;
+        # the page polls the payment until it is no longer pending.
+        # Reloads while that worker runs don't queue another Stripe lookup.
+        if (payment.payment_method == 'stripe' and payment.status == 'pending' and session_id
+                and cache.add(f"stripe_checkout:{session_id}", 1, timeout=STRIPE_CHECKOUT_DEDUPE_TIMEOUT)):
             try:
-                import stripe
-                from django.conf import settings as django_settings
-                from accounts.models import CreditTransaction
-
-                stripe.api_key = django_settings.STRIPE_SECRET_KEY
-
-                # Retrieve the checkout session
-                session = stripe.checkout.Session.retrieve(session_id)
-
-                # Check if payment was successful
-                if session.payment_status == 'paid':
-                    # Update payment status
-                    payment.status = 'completed'
-                    payment.completed_at = timezone.now()
-                    payment.save()
-
-                    # Award credits (check if not already awarded)
-                    user = payment.user
-                    if payment.credits_awarded > 0:
-                        # Check if credits already awarded (avoid duplicate)
-                        existing_transaction = CreditTransaction.objects.filter(
-                            user=user,
-                            description=f"Credit purchase via stripe",
-                            amount=payment.credits_awarded,
-                            created_at__gte=timezone.now() - timezone.timedelta(minutes=5)
-                        ).exists()
-
-                        if not existing_transaction:
-                            user.add_credits(payment.credits_awarded)
-
-                            # Create credit transaction
-                            CreditTransaction.objects.create(
-                                user=user,
-                                amount=payment.credits_awarded,
-                                transaction_type='purchase',
-                                description=f"Credit purchase via stripe",
-                                balance_after=user.credits
-                            )
-
-                            # Send notification
-                            from accounts.models import Notification
-                            Notification.create_notification(
-                                user=user,
-                                title='Payment Successful!',
-                                message=f'{payment.credits_awarded:,} credits have been added to your account.',
-                                notification_type='success',
-                                link='/dashboard'
-                            )
-
+                _run_task(finalize_stripe_checkout, str(payment.id), session_id)
             except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Error processing Stripe payment on success page: {str(e)}", exc_info=True)
                 # Don't fail the page render, just log the error
+        elif payment.status in ('failed', 'cancelled'):
+            return redirect('pricing')
 
         return render(request, 'payment_success.html', {'payment': payment})
     except Payment.DoesNotExist:
@@ -805,11 +845,6 @@ def payment_success_page(request):
 @login_required
 def paypal_return(request):
     """Handle PayPal return callback"""
-    from .payment_gateways import PayPalGateway, PaymentGatewayError
-    from accounts.models import Notification
-    import logging
-    logger = logging.getLogger(__name__)
-
     token = request.GET.get('token')
     order_id = request.GET.get('token')  # PayPal returns order_id as token
     payer_id = request.GET.get('PayerID')  # PayPal also sends PayerID
@@ -832,96 +867,18 @@ def paypal_return(request):
             return redirect('pricing')
 
         # Verify user matches (but allow if request user is the payment owner)
-        if payment.user != request.user:
-            logger.warning(f"PayPal return - User mismatch. Payment user: {payment.user.id}, Request user: {request.user.id}")
+        if payment.user_id != request.user.id:
+            logger.warning(f"PayPal return - User mismatch. Payment user: {payment.user_id}, Request user: {request.user.id}")
             # Still process if payment user is valid
 
         # Check if already completed (avoid duplicate processing)
         if payment.status == 'completed':
             logger.info(f"PayPal return - Payment already completed: {order_id}")
-            return redirect(f'/api/payments/success/?payment_id={payment.id}')
+            return _redirect_to_success(payment)
 
-        # Capture the payment
-        gateway = PayPalGateway()
-
-        try:
-            result = gateway.capture_order(order_id)
-            logger.info(f"PayPal capture result: {result}")
-        except PaymentGatewayError as e:
-            # Check if order was already captured
-            logger.warning(f"PayPal capture error: {e}. Checking order status...")
-            try:
-                order_details = gateway.get_order(order_id)
-                logger.info(f"PayPal order details: {order_details}")
-                if order_details.get('status') == 'COMPLETED':
-                    result = {'success': True, 'status': 'COMPLETED'}
-                else:
-                    raise e
-            except Exception as check_error:
-                logger.error(f"Error checking order status: {check_error}")
-                payment.status = 'failed'
-                payment.error_message = str(e)
-                payment.save()
-                return redirect('pricing')
-
-        if result.get('success') and result.get('status') == 'COMPLETED':
-            # Store full PayPal response
-            try:
-                order_details = gateway.get_order(order_id)
-                gateway_response = {
-                    'order_id': order_id,
-                    'status': result.get('status'),
-                    'payer_id': payer_id,
-                    'capture_result': result,
-                    'order_details': order_details,
-                }
-            except Exception as e:
-                gateway_response = {
-                    'order_id': order_id,
-                    'status': result.get('status'),
-                    'payer_id': payer_id,
-                    'capture_result': result,
-                    'order_fetch_error': str(e),
-                }
-
-            # Update payment status
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.gateway_response = gateway_response  # Store full response
-            payment.save()
-            logger.info(f"PayPal payment marked completed: {order_id}")
-
-            # Award credits
-            user = payment.user
-            old_balance = user.credits
-            user.add_credits(payment.credits_awarded)
-            logger.info(f"Credits awarded: {payment.credits_awarded} to user {user.email}. Old balance: {old_balance}, New balance: {user.credits}")
-
-            # Create credit transaction
-            CreditTransaction.objects.create(
-                user=user,
-                amount=payment.credits_awarded,
-                transaction_type='purchase',
-                description=f"Credit purchase via PayPal - ${payment.amount}",
-                balance_after=user.credits
-            )
-
-            # Send notification
-            Notification.create_notification(
-                user=user,
-                title='Payment Successful!',
-                message=f'{payment.credits_awarded:,} credits have been added to your account via PayPal.',
-                notification_type='success',
-                link='/dashboard'
-            )
-
-            return redirect(f'/api/payments/success/?payment_id={payment.id}')
-        else:
-            logger.error(f"PayPal payment not completed. Result: {result}")
-            payment.status = 'failed'
-            payment.error_message = f"PayPal status: {result.get('status', 'UNKNOWN')}"
-            payment.save()
-            return redirect('pricing')
+        # Capture and credit in a worker; the success page polls until it finishes
+        _run_task(finalize_paypal_order, str(payment.id), order_id, payer_id)
+        return _redirect_to_success(payment)
 
     except Payment.DoesNotExist:
         logger.error(f"PayPal return - Payment.DoesNotExist for order_id: {order_id}")
@@ -945,7 +902,7 @@ def paypal_cancel(request):
                 status='pending'
             )
             payment.status = 'cancelled'
-            payment.save()
+            payment.save(update_fields=['status'])
         except Payment.DoesNotExist:
             pass
 
@@ -959,49 +916,48 @@ def paypal_cancel(request):
 @login_required
 def jazzcash_return(request):
     """Handle JazzCash return callback"""
-    from .payment_gateways import JazzCashGateway, PaymentGatewayError
 
     try:
         # Get all POST data
         response_data = request.POST.dict()
 
         # Verify transaction
-        gateway = JazzCashGateway()
+        gateway = get_payment_gateway('jazzcash')
         result = gateway.verify_transaction(response_data)
 
-        # Find payment by transaction_id
+        # Find payment by transaction_id, locked so a replayed callback waits for this one
         transaction_id = result['transaction_id']
-        payment = Payment.objects.get(
-            transaction_id=transaction_id,
-            user=request.user,
-            payment_method='jazzcash'
-        )
-
-        # Check if payment succeeded (response code 000 means success)
-        if result['status'] == '000':
-            # Update payment status
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.save()
-
-            # Award credits
-            user = payment.user
-            user.add_credits(payment.credits_awarded)
-
-            # Create credit transaction
-            CreditTransaction.objects.create(
-                user=user,
-                amount=payment.credits_awarded,
-                transaction_type='purchase',
-                description=f"Credit purchase via JazzCash",
-                balance_after=user.credits
+        with transaction.atomic():
+            payment = Payment.objects.select_for_update().select_related('user').get(
+                transaction_id=transaction_id,
+                user=request.user,
+                payment_method='jazzcash'
             )
 
-            return redirect(f'/api/payments/success/?payment_id={payment.id}')
-        else:
-            payment.status = 'failed'
-            payment.save()
-            return redirect('pricing')
+            # Check if already completed (avoid duplicate processing)
+            if payment.status == 'completed':
+                return _redirect_to_success(payment)
+
+            # Check if payment succeeded (response code 000 means success)
+            if result['status'] == '000':
+                # Update payment status
+                payment.status = 'completed'
+                payment.completed_at = timezone.now()
+                payment.save(update_fields=['status', 'completed_at'])
+
+                # Award credits (a replayed callback finds the key already used)
+                award_credits(
+                    payment.user,
+                    payment.credits_awarded,
+                    description="Credit purchase via JazzCash",
+                    idempotency_key=f"jazzcash:{transaction_id}"
+                )
+
+                return _redirect_to_success(payment)
+            else:
+                payment.status = 'failed'
+                payment.save(update_fields=['status'])
+                return redirect('pricing')
 
     except Payment.DoesNotExist:
         return redirect('pricing')
@@ -1012,49 +968,48 @@ def jazzcash_return(request):
 @login_required
 def easypaisa_return(request):
     """Handle Easypaisa return callback"""
-    from .payment_gateways import EasypaisaGateway, PaymentGatewayError
 
     try:
         # Get all POST data
         response_data = request.POST.dict()
 
         # Verify transaction
-        gateway = EasypaisaGateway()
+        gateway = get_payment_gateway('easypaisa')
         result = gateway.verify_transaction(response_data)
 
-        # Find payment by transaction_id
+        # Find payment by transaction_id, locked so a replayed callback waits for this one
         transaction_id = result['transaction_id']
-        payment = Payment.objects.get(
-            transaction_id=transaction_id,
-            user=request.user,
-            payment_method='easypaisa'
-        )
-
-        # Check if payment succeeded (response code 0000 means success)
-        if result['status'] == '0000':
-            # Update payment status
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.save()
-
-            # Award credits
-            user = payment.user
-            user.add_credits(payment.credits_awarded)
-
-            # Create credit transaction
-            CreditTransaction.objects.create(
-                user=user,
-                amount=payment.credits_awarded,
-                transaction_type='purchase',
-                description=f"Credit purchase via Easypaisa",
-                balance_after=user.credits
+        with transaction.atomic():
+            payment = Payment.objects.select_for_update().select_related('user').get(
+                transaction_id=transaction_id,
+                user=request.user,
+                payment_method='easypaisa'
             )
 
-            return redirect(f'/api/payments/success/?payment_id={payment.id}')
-        else:
-            payment.status = 'failed'
-            payment.save()
-            return redirect('pricing')
+            # Check if already completed (avoid duplicate processing)
+            if payment.status == 'completed':
+                return _redirect_to_success(payment)
+
+            # Check if payment succeeded (response code 0000 means success)
+            if result['status'] == '0000':
+                # Update payment status
+                payment.status = 'completed'
+                payment.completed_at = timezone.now()
+                payment.save(update_fields=['status', 'completed_at'])
+
+                # Award credits (a replayed callback finds the key already used)
+                award_credits(
+                    payment.user,
+                    payment.credits_awarded,
+                    description="Credit purchase via Easypaisa",
+                    idempotency_key=f"easypaisa:{transaction_id}"
+                )
+
+                return _redirect_to_success(payment)
+            else:
+                payment.status = 'failed'
+                payment.save(update_fields=['status'])
+                return redirect('pricing')
 
     except Payment.DoesNotExist:
         return redirect('pricing')
@@ -1070,10 +1025,6 @@ def stripe_test_page(request):
     return render(request, 'stripe_test.html', context)
 
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAdminUser
-from accounts.models import ActivityLog
-
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated, IsAdminUser])
@@ -1082,7 +1033,7 @@ def delete_payment(request, payment_id):
     try:
         payment = Payment.objects.get(id=payment_id)
         transaction_id = payment.transaction_id
-        user_email = payment.user.email
+        user_email = payment.user_email
         amount = payment.amount
 
         payment.delete()
@@ -1133,16 +1084,15 @@ def delete_multiple_payments(request):
 
         # Get payments before deleting
         payments = Payment.objects.filter(id__in=payment_ids)
-        deleted_count = payments.count()
 
-        # Store payment info for logging
+        # Store payment info for logging (user_email is a column, so no user join)
         payment_info = [
-            f"{p.transaction_id} ({p.user.email}, ${p.amount})"
-            for p in payments
+            f"{transaction_id} ({user_email}, ${amount})"
+            for transaction_id, user_email, amount in payments.values_list('transaction_id', 'user_email', 'amount')
         ]
 
-        # Delete payments
-        payments.delete()
+        # Delete payments (delete() reports how many rows went)
+        deleted_count, _ = payments.delete()
 
         # Log the activity
         ActivityLog.log_activity(
@@ -1171,21 +1121,21 @@ def delete_multiple_payments(request):
 
 
 # Manual Payment Page View
-from django.shortcuts import render
-from accounts.models import PlatformSettings
-
 def manual_payment_page(request):
     """Render manual payment submission page"""
+
     payment_method = request.GET.get('method', 'jazzcash')  # jazzcash or easypaisa
     payment_type = request.GET.get('type', 'credit')
     package_id = request.GET.get('package_id')
     plan_id = request.GET.get('plan_id')
 
-    # Debug logging
-    print(f"DEBUG: payment_method={payment_method}, payment_type={payment_type}, package_id={package_id}, plan_id={plan_id}")
+    logger.debug(
+        "Manual payment page: payment_method=%s, payment_type=%s, package_id=%s, plan_id=%s",
+        payment_method, payment_type, package_id, plan_id
+    )
 
-    # Get platform settings
-    settings = PlatformSettings.get_settings()
+    # Get platform settings (loaded once per request, shared with the context processor)
+    settings = request.platform_settings
 
     # Get account details based on payment method
     if payment_method == 'jazzcash':
@@ -1207,14 +1157,15 @@ def manual_payment_page(request):
     # Get package or plan details
     if payment_type == 'credit' and package_id:
         try:
-            from .models import CreditPackage
-            package = CreditPackage.objects.get(id=package_id, is_active=True)
+            package = CreditPackage.objects.only('name', 'price', 'credits').get(id=package_id, is_active=True)
 
             # Convert USD to PKR using dynamic rate from settings
-            usd_to_pkr_rate = float(settings.usd_to_pkr_rate)
-            amount_pkr = float(package.price) * usd_to_pkr_rate
+            amount_pkr = usd_to_pkr(package.price, settings.usd_to_pkr_rate)
 
-            print(f"DEBUG: Package found - {package.name}, USD Price: {package.price}, PKR Amount: {amount_pkr:.2f}, Credits: {package.credits}")
+            logger.debug(
+                "Package found - %s, USD Price: %s, PKR Amount: %.2f, Credits: %s",
+                package.name, package.price, amount_pkr, package.credits
+            )
 
             context.update({
                 'item_name': package.name,
@@ -1231,17 +1182,18 @@ def manual_payment_page(request):
 
     elif payment_type == 'subscription' and plan_id:
         try:
-            from accounts.models import SubscriptionPlan
-            plan = SubscriptionPlan.objects.get(id=plan_id, is_active=True)
+            plan = SubscriptionPlan.objects.only('name', 'price', 'credits_per_month').get(id=plan_id, is_active=True)
 
             # Convert USD to PKR using dynamic rate from settings
-            usd_to_pkr_rate = float(settings.usd_to_pkr_rate)
-            amount_pkr = float(plan.price) * usd_to_pkr_rate
+            amount_pkr = usd_to_pkr(plan.price, settings.usd_to_pkr_rate)
 
             # Get monthly credits for subscription
-            monthly_credits = plan.credits_per_month if hasattr(plan, 'credits_per_month') else 0
+            monthly_credits = plan.credits_per_month
 
-            print(f"DEBUG: Subscription found - {plan.name}, USD Price: {plan.price}, PKR Amount: {amount_pkr:.2f}, Monthly Credits: {monthly_credits}")
+            logger.debug(
+                "Subscription found - %s, USD Price: %s, PKR Amount: %.2f, Monthly Credits: %s",
+                plan.name, plan.price, amount_pkr, monthly_credits
+            )
 
             context.update({
                 'item_name': plan.name,
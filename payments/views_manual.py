@@ -4,9 +4,12 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 from django.utils import timezone
+from datetime import timedelta
+import uuid
 from django.core.mail import send_mail
 from django.conf import settings as django_settings
-from .models import ManualPaymentRequest, CreditPackage, Payment
+from .models import ManualPaymentRequest, CreditPackage, Payment, Subscription
+from .payment_gateways import usd_to_pkr
 from .serializers import ManualPaymentRequestSerializer, CreateManualPaymentSerializer
 from accounts.models import User, SubscriptionPlan, PlatformSettings, Notification
 
@@ -21,9 +24,10 @@ class ManualPaymentRequestViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter queryset based on user role"""
         user = self.request.user
+        queryset = ManualPaymentRequest.objects.select_related('user', 'package', 'plan', 'reviewed_by')
         if user.is_staff or user.is_superuser:
-            return ManualPaymentRequest.objects.all().order_by('-created_at')
-        return ManualPaymentRequest.objects.filter(user=user).order_by('-created_at')
+            return queryset.order_by('-created_at')
+        return queryset.filter(user=user).order_by('-created_at')
 
     def create(self, request):
         """Create a new manual payment request"""
@@ -34,8 +38,9 @@ class ManualPaymentRequestViewSet(viewsets.ModelViewSet):
         payment_type = data['payment_type']
 
         # Get USD to PKR exchange rate from platform settings
-        platform_settings = PlatformSettings.get_settings()
-        usd_to_pkr_rate = float(platform_settings.usd_to_pkr_rate)
+        # Loaded once per request by PlatformSettingsMiddleware when it is installed
+        platform_settings = getattr(request, 'platform_settings', None) or PlatformSettings.get_settings()
+        usd_to_pkr_rate = platform_settings.usd_to_pkr_rate
 
         # Get package or plan and calculate credits
         package = None
@@ -50,7 +55,7 @@ class ManualPaymentRequestViewSet(viewsets.ModelViewSet):
                     is_active=True
                 )
                 # Convert USD to PKR using dynamic rate
-                amount = float(package.price) * usd_to_pkr_rate
+                amount = usd_to_pkr(package.price, usd_to_pkr_rate)
                 credits_to_award = package.credits
             except CreditPackage.DoesNotExist:
                 return Response({
@@ -64,7 +69,7 @@ class ManualPaymentRequestViewSet(viewsets.ModelViewSet):
                     is_active=True
                 )
                 # Convert USD to PKR using dynamic rate
-                amount = float(plan.price) * usd_to_pkr_rate
+                amount = usd_to_pkr(plan.price, usd_to_pkr_rate)
                 # Award monthly credits for subscription
                 credits_to_award = plan.credits_per_month if hasattr(plan, 'credits_per_month') else 0
             except SubscriptionPlan.DoesNotExist:
@@ -153,44 +158,42 @@ Please review and approve/reject this request from the admin panel.
 
             # Handle Subscription Plan Upgrade
             if payment_request.payment_type == 'subscription' and payment_request.plan:
-                from datetime import timedelta
                 plan = payment_request.plan
 
                 # Update user's subscription plan (both ForeignKey and CharField)
                 user.subscription_plan = plan
                 user.subscription_type = plan.plan_type  # Update the CharField that UI displays
-                user.subscription_start = timezone.now()
 
                 # Set subscription end date based on plan type
                 if plan.plan_type == 'yearly':
-                    user.subscription_end = timezone.now() + timedelta(days=365)
+                    user.subscription_end_date = timezone.now() + timedelta(days=365)
                 elif plan.plan_type == 'free':
-                    user.subscription_end = timezone.now() + timedelta(days=365 * 100)
+                    user.subscription_end_date = timezone.now() + timedelta(days=365 * 100)
                 else:
                     # Monthly plans (starter, basic, pro)
-                    user.subscription_end = timezone.now() + timedelta(days=30)
+                    user.subscription_end_date = timezone.now() + timedelta(days=30)
 
-                user.save()
+                user.save(update_fields=['subscription_plan', 'subscription_type', 'subscription_end_date'])
 
                 # Create or update Subscription record
-                from payments.models import Subscription
-                import uuid
 
                 # Generate unique subscription_id
                 subscription_id = f"SUB_{payment_request.payment_method.upper()}_{user.id}_{uuid.uuid4().hex[:8]}"
 
-                # Try to get existing subscription for this user
-                existing_subscription = Subscription.objects.filter(user=user).first()
-
-                if existing_subscription:
-                    # Update existing subscription
-                    existing_subscription.plan = plan
-                    existing_subscription.status = 'active'
-                    existing_subscription.start_date = timezone.now()
-                    existing_subscription.end_date = user.subscription_end
-                    existing_subscription.payment_method = payment_request.payment_method
-                    existing_subscription.auto_renew = False
-                    existing_subscription.save()
+                # Try to get existing subscription for this user (id only)
+                existing_subscription_id = Subscription.objects.filter(user=user).values_list('id', flat=True).first()
+
+                if existing_subscription_id:
+                    # Update existing subscription with a single UPDATE, no full-row save
+                    Subscription.objects.filter(id=existing_subscription_id).update(
+                        plan=plan,
+                        status='active',
+                        start_date=timezone.now(),
+                        end_date=user.subscription_end_date,
+                        payment_method=payment_request.payment_method,
+                        auto_renew=False,
+                        updated_at=timezone.now(),
+                    )
                 else:
                     # Create new subscription with unique subscription_id
                     Subscription.objects.create(
@@ -199,7 +202,7 @@ Please review and approve/reject this request from the admin panel.
                         status='active',
                         subscription_id=subscription_id,
                         start_date=timezone.now(),
-                        end_date=user.subscription_end,
+                        end_date=user.subscription_end_date,
                         payment_method=payment_request.payment_method,
                         auto_renew=False,
                     )
@@ -214,7 +217,6 @@ Please review and approve/reject this request from the admin panel.
 
                 # Create Payment record for tracking
                 # Use unique transaction_id with timestamp to avoid duplicates
-                import uuid
                 unique_txn_id = f"MANUAL_{payment_request.id}_{uuid.uuid4().hex[:8]}"
                 Payment.objects.create(
                     user=user,
@@ -349,7 +351,9 @@ Thank you for your understanding.
     @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
     def pending(self, request):
         """Get all pending manual payment requests (Admin only)"""
-        pending_requests = ManualPaymentRequest.objects.filter(status='pending')
+        pending_requests = ManualPaymentRequest.objects.filter(status='pending').select_related(
+            'user', 'package', 'plan', 'reviewed_by'
+        )
         serializer = self.get_serializer(pending_requests, many=True)
         return Response({
             'count': pending_requests.count(),
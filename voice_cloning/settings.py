@@ -85,6 +85,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'accounts.middleware.UserActivityMiddleware',  # Track user online/offline status
+    'accounts.middleware.PlatformSettingsMiddleware',  # request.platform_settings
 ]
 
 ROOT_URLCONF = 'voice_cloning.urls'
@@ -29,17 +29,9 @@ from homepage.views import (
     HomePageView, LandingPageAdminView,
     CarouselCRUDView, HeroSectionCRUDView, StatisticsCRUDView, FeaturesCRUDView, StepsCRUDView,
     TestimonialsCRUDView, DemoVoicesCRUDView, PricingCRUDView, FAQsCRUDView, UseCasesCRUDView, VideoSectionCRUDView,
-    save_carousel_slide, get_carousel_slide, delete_carousel_slide,
-    save_hero_section, get_hero_section, delete_hero_section,
-    save_statistic, get_statistic, delete_statistic,
-    save_feature, get_feature, delete_feature,
-    save_step, get_step, delete_step,
-    save_testimonial, get_testimonial, delete_testimonial,
-    save_demo_voice, get_demo_voice, delete_demo_voice,
-    save_pricing_plan, get_pricing_plan, delete_pricing_plan,
-    save_faq, get_faq, delete_faq,
-    save_usecase, get_usecase, delete_usecase,
-    save_video_section, get_video_section, delete_video_section
+    CarouselSlideAPIView, HeroSectionAPIView, StatisticAPIView, FeatureAPIView, StepAPIView,
+    TestimonialAPIView, DemoVoiceAPIView, PricingPlanAPIView, FAQAPIView, UseCaseAPIView, VideoSectionAPIView,
+    dashboard_state, bulk_delete
 )
 from accounts.views import pricing_page, dashboard_pricing_page
 from payments.views import manual_payment_page, manual_payments_admin, my_payment_requests
@@ -164,60 +156,64 @@ urlpatterns = [
     path('lp-usecases/', UseCasesCRUDView.as_view(), name='lp-usecases'),
     path('lp-video/', VideoSectionCRUDView.as_view(), name='lp-video'),
 
+    # Landing Page AJAX Endpoints - All sections in one request
+    path('api/lp-dashboard-state/', dashboard_state, name='api-lp-dashboard-state'),
+    path('api/lp-bulk-delete/', bulk_delete, name='api-lp-bulk-delete'),
+
     # Landing Page AJAX Endpoints - Carousel
-    path('api/lp-carousel/save/', save_carousel_slide, name='api-save-carousel'),
-    path('api/lp-carousel/<int:item_id>/', get_carousel_slide, name='api-get-carousel'),
-    path('api/lp-carousel/delete/<int:item_id>/', delete_carousel_slide, name='api-delete-carousel'),
+    path('api/lp-carousel/save/', CarouselSlideAPIView.as_view(action='save'), name='api-save-carousel'),
+    path('api/lp-carousel/<int:item_id>/', CarouselSlideAPIView.as_view(action='get'), name='api-get-carousel'),
+    path('api/lp-carousel/delete/<int:item_id>/', CarouselSlideAPIView.as_view(action='delete'), name='api-delete-carousel'),
 
     # Landing Page AJAX Endpoints - Hero Section
-    path('api/lp-hero/save/', save_hero_section, name='api-save-hero'),
-    path('api/lp-hero/<int:item_id>/', get_hero_section, name='api-get-hero'),
-    path('api/lp-hero/delete/<int:item_id>/', delete_hero_section, name='api-delete-hero'),
+    path('api/lp-hero/save/', HeroSectionAPIView.as_view(action='save'), name='api-save-hero'),
+    path('api/lp-hero/<int:item_id>/', HeroSectionAPIView.as_view(action='get'), name='api-get-hero'),
+    path('api/lp-hero/delete/<int:item_id>/', HeroSectionAPIView.as_view(action='delete'), name='api-delete-hero'),
 
     # Landing Page AJAX Endpoints - Statistics
-    path('api/lp-statistics/save/', save_statistic, name='api-save-statistic'),
-    path('api/lp-statistics/<int:item_id>/', get_statistic, name='api-get-statistic'),
-    path('api/lp-statistics/delete/<int:item_id>/', delete_statistic, name='api-delete-statistic'),
+    path('api/lp-statistics/save/', StatisticAPIView.as_view(action='save'), name='api-save-statistic'),
+    path('api/lp-statistics/<int:item_id>/', StatisticAPIView.as_view(action='get'), name='api-get-statistic'),
+    path('api/lp-statistics/delete/<int:item_id>/', StatisticAPIView.as_view(action='delete'), name='api-delete-statistic'),
 
     # Landing Page AJAX Endpoints - Features
-    path('api/lp-features/save/', save_feature, name='api-save-feature'),
-    path('api/lp-features/<int:item_id>/', get_feature, name='api-get-feature'),
-    path('api/lp-features/delete/<int:item_id>/', delete_feature, name='api-delete-feature'),
+    path('api/lp-features/save/', FeatureAPIView.as_view(action='save'), name='api-save-feature'),
+    path('api/lp-features/<int:item_id>/', FeatureAPIView.as_view(action='get'), name='api-get-feature'),
+    path('api/lp-features/delete/<int:item_id>/', FeatureAPIView.as_view(action='delete'), name='api-delete-feature'),
 
     # Landing Page AJAX Endpoints - Steps
-    path('api/lp-steps/save/', save_step, name='api-save-step'),
-    path('api/lp-steps/<int:item_id>/', get_step, name='api-get-step'),
-    path('api/lp-steps/delete/<int:item_id>/', delete_step, name='api-delete-step'),
+    path('api/lp-steps/save/', StepAPIView.as_view(action='save'), name='api-save-step'),
+    path('api/lp-steps/<int:item_id>/', StepAPIView.as_view(action='get'), name='api-get-step'),
+    path('api/lp-steps/delete/<int:item_id>/', StepAPIView.as_view(action='delete'), name='api-delete-step'),
 
     # Landing Page AJAX Endpoints - Testimonials
-    path('api/lp-testimonials/save/', save_testimonial, name='api-save-testimonial'),
-    path('api/lp-testimonials/<int:item_id>/', get_testimonial, name='api-get-testimonial'),
-    path('api/lp-testimonials/delete/<int:item_id>/', delete_testimonial, name='api-delete-testimonial'),
+    path('api/lp-testimonials/save/', TestimonialAPIView.as_view(action='save'), name='api-save-testimonial'),
+    path('api/lp-testimonials/<int:item_id>/', TestimonialAPIView.as_view(action='get'), name='api-get-testimonial'),
+    path('api/lp-testimonials/delete/<int:item_id>/', TestimonialAPIView.as_view(action='delete'), name='api-delete-testimonial'),
 
     # Landing Page AJAX Endpoints - Demo Voices
-    path('api/lp-demo-voices/save/', save_demo_voice, name='api-save-demo-voice'),
-    path('api/lp-demo-voices/<int:item_id>/', get_demo_voice, name='api-get-demo-voice'),
-    path('api/lp-demo-voices/delete/<int:item_id>/', delete_demo_voice, name='api-delete-demo-voice'),
+    path('api/lp-demo-voices/save/', DemoVoiceAPIView.as_view(action='save'), name='api-save-demo-voice'),
+    path('api/lp-demo-voices/<int:item_id>/', DemoVoiceAPIView.as_view(action='get'), name='api-get-demo-voice'),
+    path('api/lp-demo-voices/delete/<int:item_id>/', DemoVoiceAPIView.as_view(action='delete'), name='api-delete-demo-voice'),
 
     # Landing Page AJAX Endpoints - Pricing Plans
-    path('api/lp-pricing/save/', save_pricing_plan, name='api-save-pricing'),
-    path('api/lp-pricing/<int:item_id>/', get_pricing_plan, name='api-get-pricing'),
-    path('api/lp-pricing/delete/<int:item_id>/', delete_pricing_plan, name='api-delete-pricing'),
+    path('api/lp-pricing/save/', PricingPlanAPIView.as_view(action='save'), name='api-save-pricing'),
+    path('api/lp-pricing/<int:item_id>/', PricingPlanAPIView.as_view(action='get'), name='api-get-pricing'),
+    path('api/lp-pricing/delete/<int:item_id>/', PricingPlanAPIView.as_view(action='delete'), name='api-delete-pricing'),
 
     # Landing Page AJAX Endpoints - FAQs
-    path('api/lp-faqs/save/', save_faq, name='api-save-faq'),
-    path('api/lp-faqs/<int:item_id>/', get_faq, name='api-get-faq'),
-    path('api/lp-faqs/delete/<int:item_id>/', delete_faq, name='api-delete-faq'),
+    path('api/lp-faqs/save/', FAQAPIView.as_view(action='save'), name='api-save-faq'),
+    path('api/lp-faqs/<int:item_id>/', FAQAPIView.as_view(action='get'), name='api-get-faq'),
+    path('api/lp-faqs/delete/<int:item_id>/', FAQAPIView.as_view(action='delete'), name='api-delete-faq'),
 
     # Landing Page AJAX Endpoints - Use Cases
-    path('api/lp-usecases/save/', save_usecase, name='api-save-usecase'),
-    path('api/lp-usecases/<int:item_id>/', get_usecase, name='api-get-usecase'),
-    path('api/lp-usecases/delete/<int:item_id>/', delete_usecase, name='api-delete-usecase'),
+    path('api/lp-usecases/save/', UseCaseAPIView.as_view(action='save'), name='api-save-usecase'),
+    path('api/lp-usecases/<int:item_id>/', UseCaseAPIView.as_view(action='get'), name='api-get-usecase'),
+    path('api/lp-usecases/delete/<int:item_id>/', UseCaseAPIView.as_view(action='delete'), name='api-delete-usecase'),
 
     # Landing Page AJAX Endpoints - Video Section
-    path('api/lp-video/save/', save_video_section, name='api-save-video'),
-    path('api/lp-video/<int:item_id>/', get_video_section, name='api-get-video'),
-    path('api/lp-video/delete/<int:item_id>/', delete_video_section, name='api-delete-video'),
+    path('api/lp-video/save/', VideoSectionAPIView.as_view(action='save'), name='api-save-video'),
+    path('api/lp-video/<int:item_id>/', VideoSectionAPIView.as_view(action='get'), name='api-get-video'),
+    path('api/lp-video/delete/<int:item_id>/', VideoSectionAPIView.as_view(action='delete'), name='api-delete-video'),
 ]
 
 # Serve media files in development
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.views.decorators.http import require_http_methods
+import logging
 import os
 import uuid
 from .models import VoiceLibrary, ClonedVoice, GeneratedAudio, VoiceGenerationHistory
@@ -21,6 +22,7 @@ from .serializers import (
 from accounts.models import CreditTransaction, PlatformSettings
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class VoiceLibraryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -793,8 +795,6 @@ class DefaultVoiceManagementViewSet(viewsets.ModelViewSet):
                 'count': queryset.count()
             })
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
             logger.error(f"Error listing default voices: {str(e)}", exc_info=True)
             return Response({
                 'results': [],
@@ -803,9 +803,6 @@ class DefaultVoiceManagementViewSet(viewsets.ModelViewSet):
 
     def create(self, request, *args, **kwargs):
         """Create a new default voice"""
-        import logging
-        logger = logging.getLogger(__name__)
-
         try:
             # Validate input
             name = request.data.get('name')